@@ -1 +1,6 @@
-from .google_play_scraper import GooglePlayBot as Bot
\ No newline at end of file
+def __getattr__(name: str):
+  # the bot is loaded on first use, so importing a single module of the package does not pull in raspador and selenium
+  if name == 'Bot':
+    from .google_play_scraper import GooglePlayBot
+    return GooglePlayBot
+  raise AttributeError(name)
@@ -0,0 +1,115 @@
+import argparse
+import hashlib
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .google_play_ingestion import ExportKind, ExportSource, classify_export_sources, export_sources, unique_export_sources
+from .google_play_processor import GooglePlayProcessor
+from .google_play_writer import GooglePlayWriter, writer_for_format
+
+class GooglePlaySourcesProcessor(GooglePlayProcessor):
+  sources: Dict[ExportKind, List[ExportSource]]
+
+  def __init__(self, source_directory_path: Path, sources: Dict[ExportKind, List[ExportSource]], **options):
+    super().__init__(source_directory_path=source_directory_path, **options)
+    self.sources = sources
+
+  def export_files(self) -> Dict[ExportKind, List[ExportSource]]:
+    return self.sources
+
+def process_directory(source_directory_path: Path, sources: Dict[ExportKind, List[ExportSource]], options: Dict[str, any]) -> Tuple[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame], Dict[str, any]]:
+  processor = GooglePlaySourcesProcessor(source_directory_path=source_directory_path, sources=sources, **options)
+  processor.process()
+  frames = (
+    processor.country_impressions_df,
+    processor.country_downloads_df,
+    processor.channel_impressions_df,
+    processor.channel_downloads_df,
+  )
+  return frames, processor.reconciliation_report
+
+class GooglePlayBatchProcessor(GooglePlayProcessor):
+  source_directory_paths: List[Path]
+  max_workers: int
+
+  def __init__(self, source_directory_paths: List[Path], processed_data_path: Path, max_workers: int=1, read_workers: int=1, chunk_size: Optional[int]=None, cache_path: Optional[Path]=None, cache_format: str='parquet', writer: Optional[GooglePlayWriter]=None, compact: bool=False):
+    if not source_directory_paths:
+      raise ValueError('No source directories to process.')
+    super().__init__(
+      source_directory_path=source_directory_paths[0],
+      processed_data_path=processed_data_path,
+      read_workers=read_workers,
+      chunk_size=chunk_size,
+      cache_path=cache_path,
+      cache_format=cache_format,
+      writer=writer,
+      compact=compact
+    )
+    self.source_directory_paths = source_directory_paths
+    self.max_workers = max_workers
+
+  def export_files(self) -> Dict[ExportKind, List[ExportSource]]:
+    return unique_export_sources(classify_export_sources(s for path in self.source_directory_paths for s in export_sources(path)))
+
+  def directory_cache_path(self, source_directory_path: Path) -> Optional[Path]:
+    # parallel workers would overwrite each other's cache manifest, so each directory keeps its own cache below cache_path
+    if self.cache is None:
+      return None
+    return self.cache.cache_path / hashlib.sha256(str(source_directory_path.absolute()).encode()).hexdigest()[:16]
+
+  def process(self):
+    if self.max_workers <= 1:
+      # one combined read, groupby and merge across every app; rows stay keyed by app_name
+      super().process()
+      return
+
+    # each worker holds a single directory's raw exports, so only the reduced outputs have to fit in memory together;
+    # sources are deduplicated across every directory first, so an export copied into two directories is read once
+    export_files = self.export_files()
+    directory_sources = [
+      {kind: [s for s in sources if s.directory_path == path] for kind, sources in export_files.items()}
+      for path in self.source_directory_paths
+    ]
+    options = [
+      {
+        'read_workers': self.read_workers,
+        'chunk_size': self.chunk_size,
+        'cache_path': self.directory_cache_path(path),
+        'cache_format': self.cache.cache_format if self.cache else 'parquet',
+        'compact': self.compact,
+      }
+      for path in self.source_directory_paths
+    ]
+    with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+      results = list(executor.map(process_directory, self.source_directory_paths, directory_sources, options))
+
+    frames = [pd.concat(f, ignore_index=True) for f in zip(*[r[0] for r in results])]
+    if self.compact:
+      frames = [self._compact_frame(df) for df in frames]
+    self.country_impressions_df, self.country_downloads_df, self.channel_impressions_df, self.channel_downloads_df = frames
+    self.reconciliation_report = {
+      'replaced_export_rows': sum(r[1]['replaced_export_rows'] for r in results),
+      'apps': {a: m for r in results for a, m in r[1]['apps'].items()},
+    }
+
+if __name__ == '__main__':
+  arg_parser = argparse.ArgumentParser(description='Process Google Play exports for many apps into merged outputs.')
+  arg_parser.add_argument('paths', type=Path, nargs='+', help='download directories holding each app\'s exports')
+  arg_parser.add_argument('--output', type=Path, required=True, help='directory for the merged outputs')
+  arg_parser.add_argument('--workers', type=int, default=1, help='process directories in parallel with this many processes')
+  arg_parser.add_argument('--format', default='csv', help='output format (csv, parquet or feather)')
+  arg_parser.add_argument('--compact', action='store_true', help='process with the compact schema')
+  args = arg_parser.parse_args()
+
+  processor = GooglePlayBatchProcessor(
+    source_directory_paths=args.paths,
+    processed_data_path=args.output,
+    max_workers=args.workers,
+    writer=writer_for_format(output_format=args.format, partition=False, compact=args.compact),
+    compact=args.compact
+  )
+  processor.process()
+  processor.save()
+  print(f'{len(args.paths)} directories processed into {args.output} ({processor.min_processed_date}—{processor.max_processed_date})')
@@ -0,0 +1,181 @@
+import argparse
+import calendar
+import datetime
+import json
+import random
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from zipfile import ZipFile, ZIP_DEFLATED
+
+country_codes = ['US', 'GB', 'DE', 'FR', 'JP', 'BR', 'IN', 'CA', 'AU', 'MX', 'KR', 'ES', 'IT', 'NL', 'SE', '']
+channels = ['Play Store (organic)', 'Google Search (organic)', 'Third-party referrers', 'Google Ads']
+listing_title = 'Number of people that have never installed your app who visited your store listing'
+first_time_installer_title = 'Number of users who installed your app for the first time.'
+
+def month_starts(end_month: datetime.date, months: int) -> List[datetime.date]:
+  starts = []
+  year, month = end_month.year, end_month.month
+  for _ in range(months):
+    starts.append(datetime.date(year, month, 1))
+    year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+  return starts[::-1]
+
+def export_csv(header: List[str], rows: List[List[any]]) -> bytes:
+  lines = [','.join(header)] + [','.join(str(v) for v in row) for row in rows]
+  return ('\n'.join(lines) + '\n').encode('utf-16')
+
+def write_export_fixtures(directory_path: Path, apps: int, countries: int, months: int, end_month: datetime.date, seed: int=0) -> int:
+  rng = random.Random(seed)
+  row_count = 0
+  directory_path.mkdir(parents=True, exist_ok=True)
+  for app_index in range(apps):
+    app_id = f'com.example.app{app_index}'
+    for month_start in month_starts(end_month, months):
+      days = [month_start + datetime.timedelta(days=d) for d in range(calendar.monthrange(month_start.year, month_start.month)[1])]
+      country_rows = []
+      play_country_rows = []
+      channel_rows = []
+      for day in days:
+        for country in country_codes[:countries]:
+          visitors = rng.randint(0, 5000)
+          installers = rng.randint(0, visitors)
+          country_rows.append([day.isoformat(), app_id, country, visitors, installers, installers // 2, installers // 3])
+          play_country_rows.append([day.isoformat(), app_id, country, rng.randint(0, visitors), rng.randint(0, installers), 0, 0])
+        for channel in channels:
+          visitors = rng.randint(0, 20000)
+          channel_rows.append([day.isoformat(), app_id, channel, visitors, rng.randint(0, visitors), 0, 0])
+
+      month_key = month_start.strftime('%Y%m')
+      retention_columns = ['Installers retained for 1 day', 'Installers retained for 7 days']
+      with ZipFile(directory_path / f'retained_installers_{app_id}_{month_key}.zip', 'w', compression=ZIP_DEFLATED) as z:
+        z.writestr(f'retained_installers_{app_id}_{month_key}_country.csv', export_csv(['Date', 'Package Name', 'Country', 'Store Listing Visitors', 'Installers'] + retention_columns, country_rows))
+        z.writestr(f'retained_installers_{app_id}_{month_key}_play_country.csv', export_csv(['Date', 'Package Name', 'Country (Play Store)', 'Store Listing Visitors', 'Installers'] + retention_columns, play_country_rows))
+        z.writestr(f'retained_installers_{app_id}_{month_key}_channel.csv', export_csv(['Date', 'Package Name', 'Acquisition Channel', 'Store Listing Visitors', 'Installers'] + retention_columns, channel_rows))
+      row_count += len(country_rows) + len(play_country_rows) + len(channel_rows)
+  return row_count
+
+def write_scraper_fixture(directory_path: Path, app_id: str, end_date: datetime.date, days: int, seed: int=0):
+  rng = random.Random(seed)
+  lines = [',acquisition_channel,store_listing_visitors,first_time_installers,date,app_id']
+  index = 0
+  for d in range(days):
+    day = end_date - datetime.timedelta(days=d)
+    for channel in ('search', 'explore'):
+      visitors = rng.randint(0, 10000)
+      lines.append(f'{index},{channel},{visitors},{rng.randint(0, visitors)},{day.isoformat()},{app_id}')
+      index += 1
+  (directory_path / 'GooglePlayScraper.csv').write_text('\n'.join(lines) + '\n')
+
+def acquisition_report_html(rows: int=4, padding_rows: int=200, seed: int=0) -> str:
+  rng = random.Random(seed)
+  padding = ''.join(f'<div class="gwt-Label">Navigation item {i}</div>' for i in range(padding_rows))
+  channel_names = ['All', 'Total', 'Google Play search', 'Google Play explore'] + [f'Other {i}' for i in range(max(rows - 4, 0))]
+  table_rows = ''.join(
+    f'<tr><td>{name}</td>'
+    f'<td><div title="{listing_title} during the cohort">{rng.randint(0, 99999):,}</div></td>'
+    f'<td><div title="{first_time_installer_title} Cohort">{rng.randint(0, 9999):,}</div></td></tr>'
+    for name in channel_names[:rows]
+  )
+  return f'<html><head><title>Acquisition reports</title></head><body>{padding}<table>{table_rows}</table>{padding}</body></html>'
+
+def date_panel_html(month: datetime.date, last_day: int) -> str:
+  days = ''.join(f'<td><a><span>{d}</span></a></td>' for d in range(1, last_day + 1))
+  return f'<div><button aria-label="Previous page"></button><span>{month.strftime("%B %Y")}</span><button aria-label="Next page"></button><table><tr>{days}</tr></table></div>'
+
+def write_html_fixtures(directory_path: Path) -> Dict[str, Path]:
+  directory_path.mkdir(parents=True, exist_ok=True)
+  snapshots = {
+    'acquisition_report': acquisition_report_html(),
+    'date_panel': date_panel_html(month=datetime.date(2020, 10, 1), last_day=21),
+  }
+  paths = {}
+  for name, html in snapshots.items():
+    paths[name] = directory_path / f'{name}.html'
+    paths[name].write_text(html)
+  return paths
+
+def measure(name: str, run: Callable[[], any], repeat: int=1, items: Optional[int]=None) -> Dict[str, any]:
+  timings = []
+  peak = 0
+  for _ in range(repeat):
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    timings.append(time.perf_counter() - start)
+    peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+  result = {
+    'name': name,
+    'repeat': repeat,
+    'best_seconds': round(min(timings), 6),
+    'mean_seconds': round(sum(timings) / len(timings), 6),
+    'peak_traced_mb': round(peak / 2**20, 2),
+  }
+  if items is not None:
+    result['items'] = items
+    result['items_per_second'] = round(items / min(timings), 1) if min(timings) else None
+  return result
+
+def run_benchmarks(work_path: Path, apps: int, countries: int, months: int, repeat: int, parse_repeat: int, compact: bool=False) -> Dict[str, any]:
+  from .google_play_processor import GooglePlayProcessor
+  from .google_play_parser import AcquisitionReportParser, DatePanelParser, LastDayAvailableParser
+
+  end_month = datetime.date(2020, 10, 1)
+  source_path = work_path / 'exports'
+  rows = write_export_fixtures(source_path, apps=apps, countries=countries, months=months, end_month=end_month)
+  write_scraper_fixture(source_path, app_id='com.example.app0', end_date=datetime.date(2020, 10, 31), days=30)
+  html_paths = write_html_fixtures(work_path / 'html')
+
+  processed_path = work_path / 'processed'
+  processor = GooglePlayProcessor(source_directory_path=source_path, processed_data_path=processed_path, compact=compact)
+
+  def save():
+    if processed_path.exists():
+      shutil.rmtree(processed_path)
+    processor.save()
+
+  report_html = html_paths['acquisition_report'].read_text()
+  date_panel = html_paths['date_panel'].read_text()
+  results = [
+    measure('processor.process', processor.process, repeat=repeat, items=rows),
+    measure('processor.save', save, repeat=repeat, items=sum(len(df) for df in processor.processed_data_frames)),
+    measure('AcquisitionReportParser.parse', lambda: [AcquisitionReportParser(source=report_html).parse() for _ in range(parse_repeat)], repeat=repeat, items=parse_repeat),
+    measure('DatePanelParser.parse', lambda: [DatePanelParser(source=date_panel).parse() for _ in range(parse_repeat)], repeat=repeat, items=parse_repeat),
+    measure('LastDayAvailableParser.parse', lambda: [LastDayAvailableParser(source=date_panel).parse() for _ in range(parse_repeat)], repeat=repeat, items=parse_repeat),
+  ]
+  return {
+    'scale': {'apps': apps, 'countries': countries, 'months': months, 'export_rows': rows},
+    'results': results,
+    'memory': processor.memory_report,
+    'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+  }
+
+if __name__ == '__main__':
+  arg_parser = argparse.ArgumentParser(description='Benchmark the Google Play processor and parsers on synthetic fixtures.')
+  arg_parser.add_argument('--apps', type=int, default=2)
+  arg_parser.add_argument('--countries', type=int, default=len(country_codes))
+  arg_parser.add_argument('--months', type=int, default=3)
+  arg_parser.add_argument('--repeat', type=int, default=3)
+  arg_parser.add_argument('--parse-repeat', type=int, default=100)
+  arg_parser.add_argument('--compact', action='store_true', help='process with the compact schema')
+  arg_parser.add_argument('--work-path', type=Path, default=None, help='keep fixtures in this directory instead of a temporary one')
+  arg_parser.add_argument('--output', type=Path, default=None, help='write the JSON report to this file')
+  args = arg_parser.parse_args()
+
+  if args.work_path:
+    report = run_benchmarks(args.work_path, apps=args.apps, countries=args.countries, months=args.months, repeat=args.repeat, parse_repeat=args.parse_repeat, compact=args.compact)
+  else:
+    with tempfile.TemporaryDirectory() as work_directory:
+      report = run_benchmarks(Path(work_directory), apps=args.apps, countries=args.countries, months=args.months, repeat=args.repeat, parse_repeat=args.parse_repeat, compact=args.compact)
+
+  report_json = json.dumps(report, indent=2)
+  if args.output:
+    args.output.write_text(report_json)
+  print(report_json)
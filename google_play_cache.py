@@ -0,0 +1,130 @@
+import datetime
+import hashlib
+import json
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Optional
+from .google_play_ingestion import ExportKind, ExportSource
+
+class GooglePlayExportCache:
+  cache_path: Path
+  cache_format: str
+  manifest: Dict[str, Dict[str, any]]
+
+  def __init__(self, cache_path: Path, cache_format: str='parquet'):
+    if cache_format not in ('parquet', 'feather'):
+      raise ValueError('Unsupported cache format.', cache_format)
+    self.cache_path = cache_path
+    self.cache_format = cache_format
+    self.manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+
+  @property
+  def manifest_path(self) -> Path:
+    return self.cache_path / 'manifest.json'
+
+  @staticmethod
+  def content_hash(source: ExportSource) -> str:
+    digest = hashlib.sha256()
+    with source.open() as f:
+      for block in iter(lambda: f.read(1 << 20), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+  def is_current(self, source: ExportSource, kind: ExportKind, content_hash: str) -> bool:
+    entry = self.manifest.get(source.name)
+    if entry is None or entry['kind'] != kind.value or entry['content_hash'] != content_hash:
+      return False
+    return (self.cache_path / entry['file']).exists()
+
+  def store(self, source: ExportSource, kind: ExportKind, content_hash: str, df: pd.DataFrame, rows: int):
+    if not self.cache_path.exists():
+      self.cache_path.mkdir(parents=True)
+
+    file_name = f'{source.name}.{self.cache_format}'
+    self._write_frame(df, self.cache_path / file_name)
+    self.manifest[source.name] = {
+      'kind': kind.value,
+      'content_hash': content_hash,
+      'file': file_name,
+      'min_date': df.date.min().strftime('%Y-%m-%d') if not df.empty else None,
+      'max_date': df.date.max().strftime('%Y-%m-%d') if not df.empty else None,
+      'rows': rows,
+      'cached_rows': len(df),
+    }
+
+  def frames(self, kind: ExportKind, source_names: List[str]) -> List[pd.DataFrame]:
+    # only the exports of the current run are combined, however many earlier runs the cache has seen
+    names = set(source_names)
+    return [
+      self._read_frame(self.cache_path / entry['file'])
+      for name, entry in sorted(self.manifest.items())
+      if entry['kind'] == kind.value and name in names
+    ]
+
+  def save_manifest(self):
+    if not self.cache_path.exists():
+      self.cache_path.mkdir(parents=True)
+    self.manifest_path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+
+  def _read_frame(self, path: Path) -> pd.DataFrame:
+    if self.cache_format == 'feather':
+      return pd.read_feather(path)
+    return pd.read_parquet(path)
+
+  def _write_frame(self, df: pd.DataFrame, path: Path):
+    df = df.reset_index(drop=True)
+    if self.cache_format == 'feather':
+      df.to_feather(path)
+    else:
+      df.to_parquet(path, index=False)
+
+class ScrapedDayCache:
+  cache_path: Path
+  freshness_days: int
+  manifest: Dict[str, Dict[str, any]]
+
+  def __init__(self, cache_path: Path, freshness_days: int=3):
+    self.cache_path = cache_path
+    self.freshness_days = freshness_days
+    self.manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+
+  @property
+  def manifest_path(self) -> Path:
+    return self.cache_path / 'manifest.json'
+
+  def is_final(self, date: datetime.date) -> bool:
+    # the console restates recent days, so a day is only reused once it was scraped from outside the freshness window
+    entry = self.manifest.get(date.strftime('%Y-%m-%d'))
+    if entry is None or not (self.cache_path / entry['file']).exists():
+      return False
+    last_available = datetime.datetime.strptime(entry['last_available'], '%Y-%m-%d').date()
+    return (last_available - date).days >= self.freshness_days
+
+  def frame(self, date: datetime.date) -> Optional[pd.DataFrame]:
+    if not self.is_final(date):
+      return None
+    return pd.read_csv(self.cache_path / self.manifest[date.strftime('%Y-%m-%d')]['file'])
+
+  def store(self, date: datetime.date, df: pd.DataFrame, last_available: datetime.date):
+    if not self.cache_path.exists():
+      self.cache_path.mkdir(parents=True)
+
+    day = date.strftime('%Y-%m-%d')
+    file_name = f'{day}.csv'
+    partial_path = self.cache_path / f'{file_name}.part'
+    df.drop(columns=['date'], errors='ignore').to_csv(partial_path, index=False)
+    partial_path.rename(self.cache_path / file_name)
+    self.manifest[day] = {
+      'file': file_name,
+      'last_available': last_available.strftime('%Y-%m-%d'),
+      'scraped_at': datetime.datetime.utcnow().isoformat(timespec='seconds'),
+      'rows': len(df),
+    }
+    # written per day so that an interrupted backfill resumes from the last stored day
+    self.save_manifest()
+
+  def save_manifest(self):
+    if not self.cache_path.exists():
+      self.cache_path.mkdir(parents=True)
+    self.manifest_path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
@@ -0,0 +1,74 @@
+import datetime
+import json
+import os
+import time
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+scrape_checkpoint_file_name = 'scrape_checkpoint.jsonl'
+
+class ScrapeCheckpoint:
+  path: Path
+  _days: Optional[Dict[str, List[Dict[str, any]]]]
+
+  def __init__(self, path: Path):
+    self.path = path
+    self._days = None
+
+  @property
+  def days(self) -> Dict[str, List[Dict[str, any]]]:
+    if self._days is None:
+      self._days = {}
+      if self.path.exists():
+        with open(self.path) as f:
+          for line in f:
+            try:
+              entry = json.loads(line)
+            except ValueError:
+              # a run killed mid-write leaves a truncated last line; that day is simply scraped again
+              continue
+            self._days[entry['date']] = entry['rows']
+    return self._days
+
+  def contains(self, date: datetime.date) -> bool:
+    return date.strftime('%Y-%m-%d') in self.days
+
+  def append(self, date: datetime.date, df: pd.DataFrame):
+    day = date.strftime('%Y-%m-%d')
+    rows = json.loads(df.drop(columns=['date'], errors='ignore').to_json(orient='records'))
+    with open(self.path, 'a') as f:
+      f.write(json.dumps({'date': day, 'rows': rows}) + '\n')
+      f.flush()
+      os.fsync(f.fileno())
+    self.days[day] = rows
+
+  def frame(self, dates: Iterable[datetime.date]) -> pd.DataFrame:
+    days = {d.strftime('%Y-%m-%d') for d in dates}
+    records = [
+      {**row, 'date': day}
+      for day, rows in self.days.items() if day in days
+      for row in rows
+    ]
+    if not records:
+      return pd.DataFrame()
+    df = pd.DataFrame.from_records(records)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+def interrupted_scrape_path(app_directory_path: Path, max_age_days: Optional[float]=None) -> Optional[Path]:
+  # the latest run that checkpointed days but never wrote its scraper export was interrupted mid-scrape
+  if not app_directory_path.exists():
+    return None
+  run_paths = sorted(
+    (p for p in app_directory_path.iterdir() if (p / scrape_checkpoint_file_name).exists()),
+    key=lambda p: (p / scrape_checkpoint_file_name).stat().st_mtime
+  )
+  if not run_paths or (run_paths[-1] / 'GooglePlayScraper.csv').exists():
+    return None
+  # days inside the restatement window may have changed since an older checkpoint was written, so it is not resumed
+  checkpoint_age = time.time() - (run_paths[-1] / scrape_checkpoint_file_name).stat().st_mtime
+  if max_age_days is not None and checkpoint_age > max_age_days * 86400:
+    return None
+  return run_paths[-1]
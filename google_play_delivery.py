@@ -0,0 +1,119 @@
+import random
+import shutil
+import time
+import urllib.request
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from zipfile import ZipFile, ZIP_DEFLATED
+
+packaging_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='google-play-packaging')
+
+def package_directory(data_path: Path, zip_path: Path, compression_level: int=6) -> Path:
+  partial_path = zip_path.with_name(f'{zip_path.name}.part')
+  # ZipFile.write streams each file through the compressor in blocks, so memory stays flat for large outputs
+  with ZipFile(partial_path, 'w', compression=ZIP_DEFLATED, compresslevel=compression_level) as z:
+    for data_file_path in sorted(p for p in data_path.rglob('*') if p.is_file()):
+      z.write(data_file_path)
+  return partial_path.rename(zip_path)
+
+def package_directory_async(data_path: Path, zip_path: Path, compression_level: int=6) -> 'Future[Path]':
+  return packaging_executor.submit(package_directory, data_path, zip_path, compression_level)
+
+class DeliverySink:
+  def prepare(self):
+    pass
+
+  def deliver(self, package_path: Path, filename: str, comment: str):
+    raise NotImplementedError()
+
+class FileDropDeliverySink(DeliverySink):
+  drop_path: Path
+
+  def __init__(self, drop_path: Path):
+    self.drop_path = drop_path
+
+  def deliver(self, package_path: Path, filename: str, comment: str):
+    self.drop_path.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(package_path, self.drop_path / filename)
+    (self.drop_path / f'{filename}.txt').write_text(comment)
+
+class SlackDeliverySink(DeliverySink):
+  token: str
+  channel: str
+  retries: int
+  channel_id: Optional[str]
+
+  def __init__(self, token: str, channel: str, retries: int=3):
+    self.token = token
+    self.channel = channel
+    self.retries = retries
+    self.channel_id = None
+
+  @property
+  def client(self):
+    import slack
+    return slack.WebClient(token=self.token)
+
+  def prepare(self):
+    if self.channel_id:
+      return
+    if not self.channel.startswith('#'):
+      self.channel_id = self.channel
+      return
+
+    client = self.client
+    cursor = None
+    while True:
+      response = client.conversations_list(cursor=cursor, limit=1000, exclude_archived=True, types='public_channel,private_channel')
+      for channel in response['channels']:
+        if channel['name'] == self.channel[1:]:
+          self.channel_id = channel['id']
+          return
+      cursor = response.get('response_metadata', {}).get('next_cursor')
+      if not cursor:
+        raise ValueError('Slack channel not found.', self.channel)
+
+  def stream_upload(self, upload_url: str, package_path: Path):
+    with open(package_path, 'rb') as f:
+      request = urllib.request.Request(upload_url, data=f, method='POST', headers={
+        'Content-Length': str(package_path.stat().st_size),
+        'Content-Type': 'application/octet-stream',
+      })
+      with urllib.request.urlopen(request) as response:
+        response.read()
+
+  def deliver(self, package_path: Path, filename: str, comment: str):
+    self.prepare()
+    client = self.client
+    for attempt in range(self.retries + 1):
+      try:
+        # Slack upload URLs are single use, so a failed transfer restarts with a fresh URL
+        upload = client.api_call('files.getUploadURLExternal', http_verb='GET', params={
+          'filename': filename,
+          'length': package_path.stat().st_size,
+        })
+        self.stream_upload(upload['upload_url'], package_path)
+        client.api_call('files.completeUploadExternal', json={
+          'files': [{'id': upload['file_id'], 'title': filename}],
+          'channel_id': self.channel_id,
+          'initial_comment': comment,
+        })
+        return
+      except Exception:
+        if attempt == self.retries:
+          raise
+        time.sleep(min(2 ** attempt, 30) * (0.5 + random.random()))
+
+def delivery_sink_for(config: Dict[str, any]) -> DeliverySink:
+  delivery = config.get('delivery', 'slack')
+  if delivery == 'file':
+    return FileDropDeliverySink(drop_path=Path(config['delivery_path']))
+  if delivery == 'slack':
+    return SlackDeliverySink(
+      token=config['slackbot_api_token'],
+      channel=config.get('slack_channel', '#xyla-devs'),
+      retries=config.get('delivery_retries', 3)
+    )
+  raise ValueError('Unsupported delivery.', delivery)
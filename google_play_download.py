@@ -0,0 +1,104 @@
+import datetime
+import time
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from zipfile import ZipFile, BadZipFile
+from .google_play_wait import partial_download_patterns
+
+class BulkExportDownloadManager:
+  directory_path: Path
+  watch_path: Path
+  app_id: str
+  stable_seconds: float
+  started_at: float
+  browser_download_path: Path
+  completed: Dict[datetime.date, Path]
+  invalid: Dict[datetime.date, Path]
+  _preexisting: Set[Path]
+  _sizes: Dict[Path, Tuple[int, float]]
+
+  def __init__(self, directory_path: Path, app_id: str, stable_seconds: float=1.0, browser_download_path: Path=Path('.')):
+    self.directory_path = directory_path
+    self.watch_path = directory_path
+    self.browser_download_path = browser_download_path
+    self.app_id = app_id
+    self.stable_seconds = stable_seconds
+    self.started_at = time.time()
+    self.completed = {}
+    self.invalid = {}
+    self._preexisting = set()
+    self._sizes = {}
+
+  @staticmethod
+  def month_for(date: datetime.date) -> datetime.date:
+    return datetime.date(date.year, date.month, 1)
+
+  def direct_browser_downloads(self, driver: any) -> bool:
+    # chromium can retarget downloads at runtime; other browsers keep the directory they were launched with, which is then
+    # watched instead, ignoring any export that was already there, so an earlier or concurrent run's file is never claimed
+    if not hasattr(driver, 'execute_cdp_cmd'):
+      self.watch_path = self.browser_download_path
+      self._preexisting = set(self.watch_path.glob(f'retained_installers_{self.app_id}_*.zip'))
+      return False
+    driver.execute_cdp_cmd('Page.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': str(self.directory_path.absolute())})
+    return True
+
+  def candidate_path(self, month: datetime.date) -> Optional[Path]:
+    candidates = [
+      p for p in self.watch_path.glob(f'retained_installers_{self.app_id}_{month.strftime("%Y%m")}*.zip')
+      if p.stat().st_mtime >= self.started_at - 1.0 and p not in self.invalid.values() and p not in self._preexisting
+    ]
+    return max(candidates, key=lambda p: p.stat().st_mtime) if candidates else None
+
+  def has_partial_downloads(self) -> bool:
+    return any(
+      p.stat().st_mtime >= self.started_at - 1.0
+      for pattern in partial_download_patterns
+      for p in self.watch_path.glob(pattern)
+    )
+
+  def unrequested_months(self, months: List[datetime.date]) -> List[datetime.date]:
+    # a month whose file has started arriving is only slow; requesting it again would download it twice
+    if self.has_partial_downloads():
+      return []
+    return [m for m in months if m not in self.completed and self.candidate_path(m) is None]
+
+  def is_stable(self, path: Path) -> bool:
+    size = path.stat().st_size
+    now = time.monotonic()
+    previous = self._sizes.get(path)
+    if previous is None or previous[0] != size:
+      self._sizes[path] = (size, now)
+      return False
+    return size > 0 and now - previous[1] >= self.stable_seconds
+
+  def poll(self, months: List[datetime.date]) -> bool:
+    pending = [m for m in months if m not in self.completed]
+    if pending and self.has_partial_downloads():
+      return False
+
+    for month in pending:
+      path = self.candidate_path(month)
+      if path is None or not self.is_stable(path):
+        continue
+      if not self.is_valid(path):
+        self.invalid[month] = path
+        continue
+      if self.watch_path != self.directory_path:
+        path = path.rename(self.directory_path / path.name)
+      self.completed[month] = path
+    return all(m in self.completed for m in months)
+
+  def is_valid(self, path: Path) -> bool:
+    try:
+      with ZipFile(path) as z:
+        return z.testzip() is None
+    except BadZipFile:
+      return False
+
+  def discard_invalid(self):
+    for path in self.invalid.values():
+      if path.exists():
+        path.unlink()
+    self.invalid = {}
@@ -0,0 +1,148 @@
+import io
+import os
+import re
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from zipfile import ZipFile
+from typing import Dict, Generator, IO, Iterable, List, Optional
+
+export_dtypes = {
+  'Store Listing Visitors': 'float64',
+  'Installers': 'float64',
+}
+compact_export_dtypes = {
+  **export_dtypes,
+  'Package Name': 'category',
+  'Country': 'category',
+  'Country (Play Store)': 'category',
+  'Acquisition Channel': 'category',
+}
+
+class ExportKind(Enum):
+  play_country = 'play_country'
+  country = 'country'
+  channel = 'channel'
+  scraper = 'scraper'
+
+  @classmethod
+  def for_file_name(cls, file_name: str) -> Optional['ExportKind']:
+    if not re.search('csv', file_name):
+      return None
+    if re.search('GooglePlayScraper', file_name):
+      return cls.scraper
+    if re.search('play_country.csv', file_name):
+      return cls.play_country
+    if re.search('country.csv', file_name):
+      return cls.country
+    if re.search('channel.csv', file_name):
+      return cls.channel
+    return None
+
+class ExportSource:
+  name: str
+  directory_path: Path
+
+  @contextmanager
+  def open(self) -> Generator[IO[bytes], None, None]:
+    raise NotImplementedError()
+
+class FileExportSource(ExportSource):
+  path: Path
+
+  def __init__(self, path: Path):
+    self.path = path
+    self.name = path.name
+    self.directory_path = path.parent
+
+  @contextmanager
+  def open(self) -> Generator[IO[bytes], None, None]:
+    with open(self.path, 'rb') as f:
+      yield f
+
+class ZipMemberExportSource(ExportSource):
+  zip_path: Path
+  member_name: str
+
+  def __init__(self, zip_path: Path, member_name: str):
+    self.zip_path = zip_path
+    self.member_name = member_name
+    self.name = Path(member_name).name
+    self.directory_path = zip_path.parent
+
+  @contextmanager
+  def open(self) -> Generator[IO[bytes], None, None]:
+    with ZipFile(self.zip_path) as archive, archive.open(self.member_name) as member:
+      yield member
+
+def export_sources(directory_path: Path) -> List[ExportSource]:
+  file_names = os.listdir(directory_path)
+  zip_sources = []
+  for f in file_names:
+    if not f.endswith('.zip'):
+      continue
+    with ZipFile(directory_path / f) as archive:
+      zip_sources.extend(ZipMemberExportSource(zip_path=directory_path / f, member_name=m) for m in archive.namelist() if not m.endswith('/'))
+  # members are read in place, so loose copies left behind by earlier extractions are ignored
+  zip_member_names = {s.name for s in zip_sources}
+  file_sources = [
+    FileExportSource(path=directory_path / f)
+    for f in file_names
+    if f not in zip_member_names and (directory_path / f).is_file()
+  ]
+  return zip_sources + file_sources
+
+def classify_export_sources(sources: Iterable[ExportSource]) -> Dict[ExportKind, List[ExportSource]]:
+  classified = {k: [] for k in ExportKind}
+  for source in sources:
+    kind = ExportKind.for_file_name(source.name)
+    if kind is not None:
+      classified[kind].append(source)
+  return classified
+
+def unique_export_sources(classified: Dict[ExportKind, List[ExportSource]]) -> Dict[ExportKind, List[ExportSource]]:
+  # an export named for the same app and month can be downloaded into several directories; only the last copy is kept so
+  # its rows are not counted twice. every scraper export shares one file name, so those are all kept
+  return {
+    kind: sources if kind is ExportKind.scraper else list({s.name: s for s in sources}.values())
+    for kind, sources in classified.items()
+  }
+
+class GooglePlayExportReader:
+  max_workers: int
+  chunk_size: Optional[int]
+  dtypes: Dict[str, str]
+
+  def __init__(self, max_workers: int=1, chunk_size: Optional[int]=None, compact: bool=False):
+    self.max_workers = max_workers
+    self.chunk_size = chunk_size
+    self.dtypes = compact_export_dtypes if compact else export_dtypes
+
+  def read_export(self, source: ExportSource) -> pd.DataFrame:
+    with source.open() as f:
+      return pd.read_csv(io.TextIOWrapper(f, encoding='utf-16'), na_filter=False, dtype=self.dtypes)
+
+  def read_each(self, sources: List[ExportSource]) -> List[pd.DataFrame]:
+    if self.max_workers > 1 and len(sources) > 1:
+      with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        frames = list(executor.map(self.read_export, sources))
+    else:
+      frames = [self.read_export(s) for s in sources]
+    return [df.astype({'Date': 'datetime64[ns]'}) for df in frames]
+
+  def read_exports(self, sources: List[ExportSource]) -> pd.DataFrame:
+    if not sources:
+      return pd.DataFrame()
+
+    # later files first, matching the row order of the historical prepend-based reader
+    return pd.concat(self.read_each(sources)[::-1])
+
+  def iter_export_chunks(self, sources: List[ExportSource]) -> Generator[pd.DataFrame, None, None]:
+    for source in sources[::-1]:
+      with source.open() as f:
+        chunks = pd.read_csv(io.TextIOWrapper(f, encoding='utf-16'), na_filter=False, dtype=self.dtypes, chunksize=self.chunk_size)
+        for chunk in chunks:
+          yield chunk.astype({'Date': 'datetime64[ns]'})
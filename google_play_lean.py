@@ -0,0 +1,100 @@
+import re
+
+from typing import Dict, List, Optional
+
+default_blocked_patterns = [
+  # images
+  '*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.ico*', '*googleusercontent.com/*',
+  # fonts
+  '*.woff*', '*.ttf*', '*.otf*', '*fonts.gstatic.com/*', '*fonts.googleapis.com/*',
+  # analytics and logging beacons
+  '*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*', '*csi.gstatic.com/*', '*/gen_204*', '*play.google.com/log?*',
+]
+
+resource_entries_script = '''
+performance.setResourceTimingBufferSize(10000);
+return performance.getEntriesByType('resource').map(function(e) { return [e.name, e.transferSize || 0]; });
+'''
+
+def pattern_expression(pattern: str) -> re.Pattern:
+  # blocked URL patterns only treat '*' as a wildcard
+  return re.compile('^' + '.*'.join(re.escape(p) for p in pattern.split('*')) + '$')
+
+class LeanBrowsingProfile:
+  blocked_patterns: List[str]
+  baseline_pages: int
+  applied: bool
+  supported: bool
+  pages: List[Dict[str, any]]
+  _expressions: List[re.Pattern]
+
+  def __init__(self, blocked_patterns: Optional[List[str]]=None, unblocked_patterns: Optional[List[str]]=None, baseline_pages: int=1):
+    blocked_patterns = blocked_patterns if blocked_patterns is not None else default_blocked_patterns
+    # unblocked_patterns removes entries from the block list; they cannot carve exceptions out of a broader blocked pattern,
+    # since Network.setBlockedURLs has no allow rules and selenium cannot answer Fetch.requestPaused events to make its own
+    unblocked = unblocked_patterns if unblocked_patterns else []
+    unmatched = [p for p in unblocked if p not in blocked_patterns]
+    if unmatched:
+      raise ValueError('Unblocked patterns match no blocked pattern.', unmatched)
+    self.blocked_patterns = [p for p in blocked_patterns if p not in unblocked]
+    self.baseline_pages = baseline_pages
+    self.applied = False
+    self.supported = True
+    self.pages = []
+    self._expressions = [pattern_expression(p) for p in self.blocked_patterns]
+
+  @classmethod
+  def from_config(cls, config: any) -> Optional['LeanBrowsingProfile']:
+    if not config:
+      return None
+    return cls(**config) if isinstance(config, dict) else cls()
+
+  def is_blocked(self, url: str) -> bool:
+    return any(e.match(url) for e in self._expressions)
+
+  def apply(self, driver: any):
+    # request interception is only reachable through the chromium devtools protocol; other browsers load everything
+    if not hasattr(driver, 'execute_cdp_cmd'):
+      self.supported = False
+      return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns})
+    self.applied = True
+
+  def sample(self, driver: any):
+    # called before the browser leaves a document, so the page's resource timings are still available
+    try:
+      entries = driver.execute_script(resource_entries_script) or []
+    except Exception:
+      entries = []
+    if entries:
+      blockable = [(url, size) for url, size in entries if self.is_blocked(url)]
+      self.pages.append({
+        'lean': self.applied,
+        'requests': len(entries),
+        'bytes': sum(size for _, size in entries),
+        'blockable_requests': len(blockable),
+        'blockable_bytes': sum(size for _, size in blockable),
+      })
+    if not self.applied and self.supported and len(self.pages) >= self.baseline_pages:
+      self.apply(driver)
+
+  def report(self, since: int=0) -> Dict[str, any]:
+    # the profile is shared by every app flown on a session, so lean pages are counted from the pilot's first page;
+    # blocking is applied once per session, so later apps estimate against the session's baseline pages
+    baseline = [p for p in self.pages if not p['lean']]
+    lean = [p for p in self.pages[since:] if p['lean']]
+    report = {
+      'supported': self.supported,
+      'blocked_patterns': self.blocked_patterns,
+      'baseline_pages': len(baseline),
+      'lean_pages': len(lean),
+      'lean_requests': sum(p['requests'] for p in lean),
+      'lean_bytes': sum(p['bytes'] for p in lean),
+    }
+    if baseline and lean:
+      # blocked requests never reach the page, so savings are estimated from what the unblocked baseline pages would have blocked
+      report['estimate_basis'] = f'average blockable requests and bytes of {len(baseline)} unblocked baseline page(s), scaled to {len(lean)} lean page(s)'
+      report['estimated_requests_saved'] = round(sum(p['blockable_requests'] for p in baseline) / len(baseline) * len(lean))
+      report['estimated_bytes_saved'] = round(sum(p['blockable_bytes'] for p in baseline) / len(baseline) * len(lean))
+    return report
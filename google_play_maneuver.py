@@ -1,116 +1,185 @@
 import re
+import json
 import datetime
 import pandas as pd
 import importlib
 import calendar
 import os
-import slack
 
 from google_play.google_play_pilot import GooglePlayPilot
-from google_play.google_play_processor import GooglePlayProcessor
-from raspador import Maneuver, OrdnanceManeuver, NavigationManeuver, SequenceManeuver, UploadReportRaspador, ClickXPathSequenceManeuver, InteractManeuver, OrdnanceParser, XPath, RaspadorNoOrdnanceError, ClickXPathManeuver, SeekParser, SoupElementParser, FindElementManeuver, ClickSoupElementManeuver, Element, ClickElementManeuver
-from typing import Generator, Optional, Dict, List, Tuple
-from time import sleep
-from bs4 import BeautifulSoup
+from google_play.google_play_scheduler import interaction_lock
+from google_play.google_play_navigation import month_delta, month_difference, url_parameters, replace_url_parameters, cohort_url
+from google_play.google_play_trace import traced
+from google_play.google_play_download import BulkExportDownloadManager
+from google_play.google_play_storage import BucketExportFetcher, missing_months
+from google_play.google_play_wait import xpath_displayed, xpath_hidden, window_count
+from raspador import Maneuver, OrdnanceManeuver, NavigationManeuver, UploadReportRaspador, ClickXPathSequenceManeuver, InteractManeuver, OrdnanceParser, XPath, RaspadorNoOrdnanceError, ClickXPathManeuver, SeekParser, Element, ClickElementManeuver
+from typing import Generator, Optional, Dict, List, Tuple, TYPE_CHECKING
 from pathlib import Path
-from zipfile import ZipFile
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+  from google_play.google_play_processor import GooglePlayProcessor
+
+if 'enqueue_maneuver' in globals():
+  # loaded as a raspador script (the hot_reload_maneuvers dev option), so pick up parser edits without restarting
+  import google_play.google_play_parser
+  importlib.reload(google_play.google_play_parser)
+from google_play.google_play_parser import DateNotAvailableParser, AcquisitionReportParser, AcquisitionReportRangeParser, DatePanelParser, LastDayAvailableParser
+
+def as_date(date: datetime.date) -> datetime.date:
+  return date.date() if isinstance(date, datetime.datetime) else date
+
+report_cells_xpath = "//div[contains(@title, 'Number of users who installed your app for the first time.')]"
+cohort_dates_selector_xpath = "//button[@aria-label='Cohort dates selector.']"
+
+def report_signature(pilot: GooglePlayPilot) -> Tuple[str, ...]:
+  return tuple(e.text for e in pilot.browser.driver.find_elements('xpath', report_cells_xpath))
+
+def report_dates(pilot: GooglePlayPilot) -> Tuple[Optional[str], ...]:
+  parameters = url_parameters(pilot.browser.current_url)
+  labels = tuple(e.text for e in pilot.browser.driver.find_elements('xpath', cohort_dates_selector_xpath))
+  return (parameters.get('apcs'), parameters.get('apce')) + labels
+
+def report_rendered(pilot: GooglePlayPilot, previous_dates: Optional[Tuple[Optional[str], ...]]=None):
+  # the selected dates are compared rather than the table, since consecutive days often have identical rows
+  def condition() -> bool:
+    signature = report_signature(pilot)
+    if len(signature) < 4 or not all(signature):
+      return False
+    return previous_dates is None or report_dates(pilot) != previous_dates
+  return condition
+
+def parsed(pilot: GooglePlayPilot, parser: OrdnanceParser) -> OrdnanceParser:
+  with pilot.parse_timings.timed(type(parser).__name__):
+    return parser.parse()
+
+def clickable(pilot: GooglePlayPilot, xpath: str) -> any:
+  # only the lookup is paced and retried; the click itself happens once, since repeating it could toggle a panel back
+  def find() -> any:
+    element = pilot.browser.get_clickable(xpath=xpath)
+    if element is None:
+      raise ValueError('Element not clickable.', xpath)
+    return element
+  return pilot.paced('find_clickable', find)
+
+class PacedNavigationManeuver(Maneuver[GooglePlayPilot]):
+  url: str
+
+  def __init__(self, url: str):
+    self.url = url
+    super().__init__()
+
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    pilot.paced('navigate', lambda: pilot.browser.driver.get(self.url))
+
+class PacedClickXPathsManeuver(Maneuver[GooglePlayPilot]):
+  xpaths: List[str]
+
+  def __init__(self, xpaths: List[str]):
+    self.xpaths = xpaths
+    super().__init__()
+
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    for xpath in self.xpaths:
+      clickable(pilot, xpath).click()
+
+def navigation(pilot: GooglePlayPilot, url: str) -> Maneuver:
+  if pilot.lean_browsing:
+    pilot.lean_browsing.sample(pilot.browser.driver)
+  return PacedNavigationManeuver(url=url) if pilot.pacing else NavigationManeuver(url=url)
 
-import google_play.google_play_parser
-importlib.reload(google_play.google_play_parser)
-from google_play.google_play_parser import DateNotAvailableParser, AcquisitionReportParser
+def click_xpaths(pilot: GooglePlayPilot, xpaths: List[str]) -> Maneuver:
+  if pilot.pacing:
+    return PacedClickXPathsManeuver(xpaths=xpaths)
+  return ClickXPathManeuver(xpath=xpaths[0]) if len(xpaths) == 1 else ClickXPathSequenceManeuver(xpaths=xpaths)
 
 class SignInManeuver(Maneuver[GooglePlayPilot]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    user_input = pilot.browser.get_clickable(xpath="//input[@id='identifierId']")
+    user_input = clickable(pilot, "//input[@id='identifierId']")
     user_input.click()
     user_input.send_keys(pilot.email)
-    next_button = pilot.browser.get_clickable(xpath="//div[@id='identifierNext']")
+    next_button = clickable(pilot, "//div[@id='identifierNext']")
     next_button.click()
-    sleep(pilot.sign_in_wait)
-    password_input = pilot.browser.get_clickable(xpath="//div[@id='password']/descendant::input[@type='password']")
+    password_xpath = "//div[@id='password']/descendant::input[@type='password']"
+    pilot.waits.wait_for('sign_in_password', xpath_displayed(pilot.browser, password_xpath))
+    password_input = clickable(pilot, password_xpath)
     password_input.click()
     password_input.send_keys(pilot.password)
-    password_next_button = pilot.browser.get_clickable(xpath="//div[@id='passwordNext']")
+    password_next_button = clickable(pilot, "//div[@id='passwordNext']")
     password_next_button.click()
-    sleep(pilot.sign_in_wait)
+    pilot.waits.wait_for('sign_in_submitted', xpath_hidden(pilot.browser, password_xpath))
 
 class CheckDateNotAvailableManeuver(OrdnanceManeuver[GooglePlayPilot, bool]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     date_panel_xpath = "//button[@aria-label='Cohort dates selector.']/following-sibling::div"
     date_panel = Element(element=pilot.browser.get_visible(date_panel_xpath))
+    pilot.tracer.annotate(page_source_bytes=len(date_panel.source))
     try:
       parser = DateNotAvailableParser(date_panel.source)
-      date_not_available_xpath = f'{date_panel_xpath}/{parser.parse().deploy()}'
+      date_not_available_xpath = f'{date_panel_xpath}/{parsed(pilot, parser).deploy()}'
       self.ordnance = pilot.browser.get_visible(date_not_available_xpath, timeout=2.0) is not None
     except RaspadorNoOrdnanceError:
       self.ordnance = False
 
 class FindLastDateAvailableManeuver(OrdnanceManeuver[GooglePlayPilot, datetime.date]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     date_panel_xpath = "//button[@aria-label='Cohort dates selector.']/following-sibling::div"
     date_panel = Element(element=pilot.browser.get_visible(date_panel_xpath))
-
-    def seek_last_day(parser):
-      return parser.soup.find_all('a', text=re.compile(r'^[0-9]{1,2}$'))[-1]
-
-    last_day_element = (yield FindElementManeuver(
-      parser=SoupElementParser(
-        instruction='Find last day',
-        seeker=seek_last_day,
-        source=date_panel.source
-      )
-    )).deploy()
-
-    def seek_month_and_year(parser):
-      return parser.soup.find_all('span', text=re.compile(r'^\w+ [0-9]{4}$'))[-1]
-
-    month_and_year_element = (yield FindElementManeuver(
-      parser=SoupElementParser(
-        instruction='Find month and year',
-        seeker=seek_month_and_year,
-        source=date_panel.source
-      )
-    )).deploy()
-    
-    last_date_text = f'{last_day_element.text} {month_and_year_element.text}'.strip()
-    self.ordnance = datetime.datetime.strptime(last_date_text, '%d %B %Y').date()
+    pilot.tracer.annotate(page_source_bytes=len(date_panel.source))
+    self.ordnance = parsed(pilot, LastDayAvailableParser(source=date_panel.source)).deploy()
 
 class LastDateAvailableManeuver(OrdnanceManeuver[GooglePlayPilot, datetime.date]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     # set the date breakdown to 'Day'
     date_selector_xpath = "//button[@aria-label='Cohort dates selector.']"
     date_panel_xpath = f'{date_selector_xpath}/following-sibling::div'
-    yield ClickXPathSequenceManeuver(xpaths=[
+    yield click_xpaths(pilot, [
       date_selector_xpath,
       f"{date_panel_xpath}/descendant::button"
     ])
 
+    # the last available date is almost always in the current month, so jump there before paging
+    month_and_year = (yield ScrapeMonthAndYearManeuver()).deploy()
+    yield PageMonthsManeuver(delta=max(month_difference(month_and_year, datetime.date.today()), 0))
+
     while True:
       date_not_available = yield CheckDateNotAvailableManeuver()
       if date_not_available.deploy():
         break
 
-      yield ClickXPathManeuver(xpath=f"{date_panel_xpath}/descendant::button[@aria-label='Next page']")
+      yield click_xpaths(pilot, [f"{date_panel_xpath}/descendant::button[@aria-label='Next page']"])
 
     self.ordnance = (yield FindLastDateAvailableManeuver()).deploy()
 
 class ScrapeMonthAndYearManeuver(OrdnanceManeuver[GooglePlayPilot, datetime.date]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     date_panel_xpath = "//button[@aria-label='Cohort dates selector.']/following-sibling::div"
     date_panel = Element(element=pilot.browser.get_visible(date_panel_xpath))
+    pilot.tracer.annotate(page_source_bytes=len(date_panel.source))
+    self.ordnance = parsed(pilot, DatePanelParser(source=date_panel.source)).deploy()
 
-    def seek_month_and_year(parser):
-      return parser.soup.find_all('span', text=re.compile(r'^\w+ [0-9]{4}$'))[-1]
+class PageMonthsManeuver(Maneuver[GooglePlayPilot]):
+  delta: int
 
-    month_and_year_element = (yield FindElementManeuver(
-      parser=SoupElementParser(
-        instruction='Find month and year',
-        seeker=seek_month_and_year,
-        source=date_panel.source
-      )
-    )).deploy()
-    
-    self.ordnance = datetime.datetime.strptime(month_and_year_element.text.strip(), '%B %Y').date()
+  def __init__(self, delta: int):
+    self.delta = delta
+    super().__init__()
+
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    date_panel_xpath = "//button[@aria-label='Cohort dates selector.']/following-sibling::div"
+    label = 'Next page' if self.delta > 0 else 'Previous page'
+    page_button_xpath = f"{date_panel_xpath}/descendant::button[@aria-label='{label}']"
+    for _ in range(abs(self.delta)):
+      clickable(pilot, page_button_xpath).click()
 
 class SelectMonthAndYearManeuver(Maneuver[GooglePlayPilot]):
   month_and_year: datetime.date
@@ -119,15 +188,22 @@ class SelectMonthAndYearManeuver(Maneuver[GooglePlayPilot]):
     self.month_and_year = datetime.date(month_and_year.year, month_and_year.month, 1)
     super().__init__()
 
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     date_panel_xpath = "//button[@aria-label='Cohort dates selector.']/following-sibling::div"
 
+    month_and_year = (yield ScrapeMonthAndYearManeuver()).deploy()
+    delta = month_difference(month_and_year, self.month_and_year)
+    if delta:
+      yield PageMonthsManeuver(delta=delta)
+
+    # verify the jump, stepping one page at a time if the panel did not keep up with the batched clicks
     while True:
       month_and_year = (yield ScrapeMonthAndYearManeuver()).deploy()
       if month_and_year < self.month_and_year:
-        yield ClickXPathManeuver(f"{date_panel_xpath}/descendant::button[@aria-label='Next page']")
+        yield click_xpaths(pilot, [f"{date_panel_xpath}/descendant::button[@aria-label='Next page']"])
       elif month_and_year > self.month_and_year:
-        yield ClickXPathManeuver(f"{date_panel_xpath}/descendant::button[@aria-label='Previous page']")
+        yield click_xpaths(pilot, [f"{date_panel_xpath}/descendant::button[@aria-label='Previous page']"])
       else:
         break
 
@@ -138,28 +214,22 @@ class SelectDateManeuver(Maneuver[GooglePlayPilot]):
     self.date = date
     super().__init__()
 
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     date_panel_xpath = "//button[@aria-label='Cohort dates selector.']/following-sibling::div"
-    date_panel = Element(element=pilot.browser.get_visible(date_panel_xpath))
 
     yield SelectMonthAndYearManeuver(month_and_year=self.date)
 
-    def seek_day(parser):
-      return parser.soup.find_all('a', text=f'{self.date.day}')[-1].span
-      
-    clicked = yield ClickSoupElementManeuver(
-      parser=SoupElementParser(
-        instruction=f'Day {self.date.day}',
-        seeker=seek_day,
-        source=date_panel.source
-      ),
-      xpath_prefix=f'{date_panel_xpath}/'
-    )
+    # the day is looked up in the live panel, which already shows the selected month, instead of parsing a copy of it
+    day_xpath = f"({date_panel_xpath}/descendant::a[normalize-space(.)='{self.date.day}'])[last()]/span"
+    yield click_xpaths(pilot, [day_xpath])
 
 class ScrapeAcquisitionReportManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     parser = AcquisitionReportParser.from_browser(browser=pilot.browser)
-    self.ordnance = parser.parse().deploy()
+    pilot.tracer.annotate(page_source_bytes=len(parser.source))
+    self.ordnance = parsed(pilot, parser).deploy()
 
 class ScrapeDateManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
   date: datetime.date
@@ -168,16 +238,39 @@ class ScrapeDateManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
     self.date = date
     super().__init__()
 
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    date_selector_xpath = "//button[@aria-label='Cohort dates selector.']"
-    pilot.browser.get_clickable(xpath=date_selector_xpath).click()
-
-    select_date = yield SelectDateManeuver(date=self.date) 
-    self.require(select_date)
-    sleep(5.0)
+    previous_dates = report_dates(pilot)
+    if pilot.date_navigation == 'url':
+      yield navigation(pilot, cohort_url(pilot.browser.current_url, start_date=self.date))
+    else:
+      date_selector_xpath = "//button[@aria-label='Cohort dates selector.']"
+      clickable(pilot, date_selector_xpath).click()
+      select_date = yield SelectDateManeuver(date=self.date) 
+      self.require(select_date)
+    pilot.waits.wait_for('report_rendered', report_rendered(pilot, previous_dates=previous_dates), required=True)
     self.ordnance = (yield ScrapeAcquisitionReportManeuver()).deploy()
     self.ordnance['date'] = self.date
 
+class ScrapeCohortRangeManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
+  start_date: datetime.date
+  end_date: datetime.date
+
+  def __init__(self, start_date: datetime.date, end_date: datetime.date):
+    self.start_date = start_date
+    self.end_date = end_date
+    super().__init__()
+
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    previous_dates = report_dates(pilot)
+    range_url = cohort_url(pilot.browser.current_url, start_date=self.start_date, end_date=self.end_date)
+    yield navigation(pilot, replace_url_parameters(range_url, pilot.range_url_parameters))
+    pilot.waits.wait_for('report_rendered', report_rendered(pilot, previous_dates=previous_dates), required=True)
+    parser = AcquisitionReportRangeParser.from_browser(browser=pilot.browser)
+    pilot.tracer.annotate(page_source_bytes=len(parser.source))
+    self.ordnance = parsed(pilot, parser).deploy()
+
 class ScrapeDateRangeManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
   date_range: 'Range[datetime.date]'
 
@@ -185,78 +278,222 @@ class ScrapeDateRangeManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
     self.date_range = date_range
     super().__init__()
 
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    self.ordnance = pd.DataFrame()
-    
-    sequence = yield SequenceManeuver([
-      ScrapeDateManeuver(date=d)
-      for d in self.date_range
-    ])
-    for date in sequence.sequence:
-      self.ordnance = self.ordnance.append(date.deploy())
-
-class DownloadBulkExportManeuver(OrdnanceManeuver[GooglePlayPilot, List[Path]]):
+    dates = list(self.date_range)
+    last_available = max(as_date(d) for d in dates) if dates else None
+    cache = pilot.scrape_cache
+    # every finished day is appended to the run's checkpoint, so a restarted run only scrapes what is missing
+    checkpoint = pilot.scrape_checkpoint
+    remaining_dates = [d for d in dates if not checkpoint.contains(as_date(d))]
+    checkpointed_days = len(dates) - len(remaining_dates)
+
+    def record(date: datetime.date, df: pd.DataFrame, cached: bool=False):
+      checkpoint.append(as_date(date), df)
+      if cache and not cached:
+        cache.store(as_date(date), df, last_available=last_available)
+
+    cached_dates = set()
+    if cache:
+      for date in remaining_dates:
+        df = cache.frame(as_date(date))
+        if df is not None:
+          record(date, df, cached=True)
+          cached_dates.add(date)
+      remaining_dates = [d for d in remaining_dates if d not in cached_dates]
+    pilot.tracer.annotate(checkpointed_days=checkpointed_days, cached_days=len(cached_dates), scraped_days=len(remaining_dates))
+
+    if pilot.range_scrape_days and remaining_dates:
+      window_dates = sorted(remaining_dates)
+      range_dates = {as_date(d): d for d in window_dates}
+      for window_start in range(0, len(window_dates), pilot.range_scrape_days):
+        window = window_dates[window_start:window_start + pilot.range_scrape_days]
+        try:
+          df = (yield ScrapeCohortRangeManeuver(start_date=window[0], end_date=window[-1])).deploy()
+        except (RaspadorNoOrdnanceError, TimeoutError):
+          continue
+
+        # a day is only taken from the range view when both channels were found; the rest fall back to per-day scraping
+        df = df[df.date.isin(range_dates.keys())]
+        channel_counts = df.groupby('date').acquisition_channel.nunique()
+        df = df[df.date.isin(channel_counts[channel_counts == 2].index)]
+        for date, date_df in df.groupby('date', sort=False):
+          record(range_dates[date], date_df)
+        scraped_dates = {range_dates[d] for d in df.date}
+        remaining_dates = [d for d in remaining_dates if d not in scraped_dates]
+
+    for date in remaining_dates:
+      record(date, (yield ScrapeDateManeuver(date=date)).deploy())
+
+    self.ordnance = checkpoint.frame(as_date(d) for d in dates)
+
+class DownloadBulkExportManeuver(OrdnanceManeuver[GooglePlayPilot, Dict[datetime.date, Path]]):
   download_dates: Optional[List[datetime.datetime]]
 
   def __init__(self, download_dates: Optional[List[datetime.datetime]]=None):
     self.download_dates = download_dates
     super().__init__()
 
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    sleep(2)
+    manager = BulkExportDownloadManager(directory_path=pilot.download_path, app_id=pilot.app_id, browser_download_path=pilot.browser_download_path)
+    manager.direct_browser_downloads(pilot.browser.driver)
+    months = sorted({manager.month_for(d) for d in (self.download_dates if self.download_dates else [])})
+
+    pilot.waits.wait_for('bulk_export_link', xpath_displayed(pilot.browser, f"//a[@href='#BulkExportPlace:bep={pilot.app_id}&bet=USER_ACQUISITION']"))
     yield ClickElementManeuver(
       instruction='click the bulk export download button',
       seeker=lambda p: p.soup.find('a', {'href': f'#BulkExportPlace:bep={pilot.app_id}&bet=USER_ACQUISITION'})
     )
-    sleep(5)
 
-    for date in self.download_dates:
-      yield ClickElementManeuver(
-        instruction='click the year accordion',
-        seeker=lambda p: p.soup.find('div', {'class': 'gwt-Label'}, text=re.compile(f'{date.year}'))
-      )
+    pending = months
+    requested = months
+    for _ in range(pilot.download_retries + 1):
+      # start every requested month before waiting on any of them, opening each year accordion once
+      for year in sorted({m.year for m in requested}):
+        year_label_xpath = f"//div[contains(@class, 'gwt-Label') and contains(text(), '{year}')]"
+        pilot.waits.wait_for('accordion_label', xpath_displayed(pilot.browser, year_label_xpath))
+        yield ClickElementManeuver(
+          instruction='click the year accordion',
+          seeker=lambda p: p.soup.find('div', {'class': 'gwt-Label'}, text=re.compile(f'{year}'))
+        )
+
+        download_button_xpaths = []
+        for month in [m for m in requested if m.year == year]:
+          download_label = f'Download: Retained installers report, {calendar.month_name[month.month]} {month.year}'
+          download_button_xpaths.append(f"//button[@aria-label='{download_label}']")
+          pilot.waits.wait_for('accordion_expanded', xpath_displayed(pilot.browser, download_button_xpaths[-1]))
+          yield ClickElementManeuver(
+            instruction='click the bulk export download button',
+            seeker=lambda p: p.soup.find('button', {'aria-label': download_label})
+          )
+
+        yield ClickElementManeuver(
+          instruction='click the year accordion',
+          seeker=lambda p: p.soup.find('div', {'class': 'gwt-Label'}, text=re.compile(f'{year}'))
+        )
+        pilot.waits.wait_for('accordion_collapsed', xpath_hidden(pilot.browser, download_button_xpaths[-1]))
+
+      pilot.waits.wait_for('download_finished', lambda: manager.poll(pending))
+      pending = [m for m in pending if m not in manager.completed]
+      if not pending:
+        break
+      manager.discard_invalid()
+      requested = manager.unrequested_months(pending)
 
-      sleep(2)
-      yield ClickElementManeuver(
-        instruction='click the bulk export download button',
-        seeker=lambda p: p.soup.find('button', {'aria-label': f'Download: Retained installers report, {calendar.month_name[date.month]} {date.year}'})
-      )
+    pilot.tracer.annotate(
+      months_requested=[m.strftime('%Y-%m') for m in months],
+      months_downloaded=[m.strftime('%Y-%m') for m in sorted(manager.completed)]
+    )
+    if pending:
+      raise ValueError('Bulk exports did not arrive.', [m.strftime('%Y-%m') for m in pending])
+    self.ordnance = manager.completed
 
-      yield ClickElementManeuver(
-        instruction='click the year accordion',
-        seeker=lambda p: p.soup.find('div', {'class': 'gwt-Label'}, text=re.compile(f'{date.year}'))
-      )
-      sleep(2)
+class FetchBucketExportManeuver(OrdnanceManeuver[GooglePlayPilot, Dict[datetime.date, List[Path]]]):
+  download_dates: List[datetime.datetime]
 
-    current_dir = Path('.')
-    downloaded_file_paths = [p for p in current_dir.glob(f'retained_installers_{pilot.app_id}*.zip')]
+  def __init__(self, download_dates: List[datetime.datetime]):
+    self.download_dates = download_dates
+    super().__init__()
 
-    renamed_downloaded_file_paths = []
-    for file in downloaded_file_paths:
-      target = f'{pilot.download_path.absolute()}/{file.name}'
-      file.rename(target)
-      renamed_downloaded_file_paths.append(Path(target))
-    
-    self.ordnance = renamed_downloaded_file_paths
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    fetcher = BucketExportFetcher(
+      client=pilot.report_storage_client,
+      app_id=pilot.app_id,
+      mirror_path=pilot.report_mirror_path
+    )
+    fetched = fetcher.fetch(months=self.download_dates, directory_path=pilot.download_path)
+    pilot.tracer.annotate(months_downloaded=[m.strftime('%Y-%m') for m in sorted(fetched)])
+    # as with console downloads, incomplete exports are not processed
+    missing = missing_months(self.download_dates, fetched)
+    if missing:
+      raise ValueError('Bucket exports are missing.', [m.strftime('%Y-%m') for m in missing])
+    self.ordnance = fetched
 
 class OpenClassicPlayConsoleManeuver(Maneuver[GooglePlayPilot]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
     yield ClickElementManeuver(
       instruction='click on the "Use classic Play Console" button',
       seeker=lambda p: p.soup.find('span', {'class': 'label'}, text=re.compile('Use classic Play Console')).parent
     )
 
-    sleep(5)
+    pilot.waits.wait_for('classic_console_window', window_count(pilot.browser, 2))
     pilot.browser.driver.close()
     assert len(pilot.browser.driver.window_handles) == 1
     pilot.browser.driver.switch_to.window(pilot.browser.driver.window_handles[0])
 
-class ProcessGooglePlayDataManeuver(OrdnanceManeuver[GooglePlayPilot, GooglePlayProcessor]):
+def process_google_play_data(pilot: GooglePlayPilot) -> 'GooglePlayProcessor':
+  # imported on first use so that scraping starts without loading the processing stack
+  from google_play.google_play_processor import GooglePlayProcessor
+  from google_play.google_play_writer import writer_for_format
+
+  writer = writer_for_format(
+    output_format=pilot.output_format,
+    partition=pilot.output_partitioned,
+    compact=pilot.output_compact
+  )
+  if pilot.processing_engine == 'pandas':
+    processor = GooglePlayProcessor(
+      source_directory_path=pilot.download_path,
+      read_workers=pilot.processing_read_workers,
+      chunk_size=pilot.processing_chunk_size,
+      cache_path=pilot.processing_cache_path,
+      cache_format=pilot.processing_cache_format,
+      writer=writer,
+      compact=pilot.processing_compact
+    )
+  else:
+    from google_play.google_play_sql import GooglePlaySQLProcessor
+    processor = GooglePlaySQLProcessor(
+      source_directory_path=pilot.download_path,
+      engine=pilot.processing_engine,
+      engine_options=pilot.processing_engine_options,
+      chunk_size=pilot.processing_chunk_size,
+      writer=writer,
+      compact=pilot.processing_compact
+    )
+  processor.process()
+  processor.save()
+  (pilot.download_path / 'memory_report.json').write_text(json.dumps(processor.memory_report, indent=2))
+  (pilot.download_path / 'reconciliation_report.json').write_text(json.dumps(processor.reconciliation_report, indent=2))
+  return processor
+
+def send_data(pilot: GooglePlayPilot, data_path: Path, min_date: datetime.date, max_date: datetime.date):
+  from google_play.google_play_delivery import package_directory_async
+
+  zipfile_path = data_path.parent / f'{pilot.app_id}_{data_path.parent.name}.zip'
+  packaging = package_directory_async(data_path, zipfile_path, compression_level=pilot.zip_compression_level)
+
+  text = f'''
+*Client:* {pilot.company_name}
+*App ID:* `{pilot.app_id}`
+*Dates:* `{min_date.strftime("%Y-%m-%d")}`—`{max_date.strftime("%Y-%m-%d")}`
+'''
+
+  sink = pilot.delivery_sink
+  sink.prepare()
+  package_path = packaging.result()
+  pilot.tracer.annotate(package_bytes=package_path.stat().st_size)
+  sink.deliver(
+    package_path=package_path,
+    filename=f'{pilot.app_id}_{min_date.strftime("%Y-%m-%d")}-{max_date.strftime("%Y-%m-%d")}.zip',
+    comment=text
+  )
+
+def process_and_send_data(pilot: GooglePlayPilot) -> 'GooglePlayProcessor':
+  # spans are named after the maneuvers that run these stages inline, so traces compare across both modes
+  with pilot.tracer.span(ProcessGooglePlayDataManeuver.__name__):
+    processor = process_google_play_data(pilot)
+  with pilot.tracer.span(SendDataToSlackManeuver.__name__):
+    send_data(pilot, data_path=processor.processed_data_path, min_date=processor.min_processed_date, max_date=processor.max_processed_date)
+  return processor
+
+class ProcessGooglePlayDataManeuver(OrdnanceManeuver[GooglePlayPilot, 'GooglePlayProcessor']):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    processor = GooglePlayProcessor(source_directory_path=pilot.download_path)
-    processor.process()
-    processor.save()
-    self.ordnance = processor
+    self.ordnance = process_google_play_data(pilot)
 
 class SendDataToSlackManeuver(Maneuver[GooglePlayPilot]):
   data_path: Path
@@ -269,47 +506,70 @@ class SendDataToSlackManeuver(Maneuver[GooglePlayPilot]):
     self.max_date = max_date
     super().__init__()
 
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    zipfile_path = f'{str(self.data_path.parent)}/{pilot.app_id}_{self.data_path.parent.name}.zip'
-    with ZipFile(zipfile_path, 'w') as z:
-      for csv_file_path in self.data_path.glob("*.csv"):
-        z.write(csv_file_path)
-      z.close()
+    send_data(pilot, data_path=self.data_path, min_date=self.min_date, max_date=self.max_date)
 
-    text = f'''
-*Client:* {pilot.company_name}
-*App ID:* `{pilot.app_id}`
-*Dates:* `{self.min_date.strftime("%Y-%m-%d")}`—`{self.max_date.strftime("%Y-%m-%d")}`
-'''
-
-    client = slack.WebClient(token=pilot.slackbot_api_token)
-    client.files_upload(
-      channels='#xyla-devs',
-      initial_comment=text,
-      file=zipfile_path,
-      filename=f'{pilot.app_id}_{self.min_date.strftime("%Y-%m-%d")}-{self.max_date.strftime("%Y-%m-%d")}.zip',
-      filetype='zip'
-    )
-
-class GooglePlayManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
+class RestoreSessionManeuver(OrdnanceManeuver[GooglePlayPilot, bool]):
+  @traced
   def attempt(self, pilot: GooglePlayPilot):
-    yield NavigationManeuver(url='https://accounts.google.com/signin/v2/identifier?service=androiddeveloper&passive=true&continue=https%3A%2F%2Fplay.google.com%2Fconsole%2Fdeveloper%2F')
-    yield SignInManeuver()
-
-    # This interact halts the program so that 2-factor auth can be used to sign in
-    # continue after successfully using the Gmail app to sign in, or after the following manual steps are completed
-    yield InteractManeuver()
+    self.ordnance = False
+    console_url = pilot.session.console_urls.get(pilot.company_name, pilot.console_home_url)
+    if not pilot.session_store.restore(session=pilot.session, driver=pilot.browser.driver, console_url=console_url):
+      return
+
+    # an expired session is redirected to the sign-in host, which is the cheapest validity check available
+    yield navigation(pilot, pilot.session.console_urls.get(pilot.company_name, pilot.console_home_url))
+    if urlparse(pilot.browser.current_url).netloc == urlparse(pilot.sign_in_url).netloc:
+      pilot.session_store.clear(pilot.email)
+      pilot.session.console_urls.clear()
+      pilot.browser.driver.delete_all_cookies()
+      return
+
+    pilot.session.signed_in = True
+    self.ordnance = True
+
+class OpenConsoleManeuver(Maneuver[GooglePlayPilot]):
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    if not pilot.session.signed_in and pilot.session_store:
+      yield RestoreSessionManeuver()
+
+    # an account session that already reached the classic console for this company can go straight back to it
+    if pilot.session.signed_in and pilot.company_name in pilot.session.console_urls:
+      yield navigation(pilot, pilot.session.console_urls[pilot.company_name])
+      return
+
+    if pilot.session.signed_in:
+      yield navigation(pilot, pilot.console_home_url)
+    else:
+      yield navigation(pilot, pilot.sign_in_url)
+      yield SignInManeuver()
+
+      # This interact halts the program so that 2-factor auth can be used to sign in
+      # continue after successfully using the Gmail app to sign in, or after the following manual steps are completed
+      with interaction_lock:
+        yield InteractManeuver()
+      pilot.session.signed_in = True
 
     # ----- comment this block out if these things should be done manually ----------
-    company_name = pilot.config['company_name']
+    company_name = pilot.company_name
     yield ClickElementManeuver(
       instruction=f'click the company name after signing in: {company_name}',
-      seeker=lambda p: p.soup.find('div', {'class': 'business-name'}, text=re.compile(company_name))
+      seeker=lambda p: p.soup.find('div', {'class': pilot.company_name_class}, text=re.compile(company_name))
     )
-    sleep(5)
+    pilot.waits.wait_for('classic_console_button', xpath_displayed(pilot.browser, "//span[contains(@class, 'label') and contains(text(), 'Use classic Play Console')]"))
     yield OpenClassicPlayConsoleManeuver()
+    pilot.session.console_urls[company_name] = pilot.browser.current_url
+    if pilot.session_store:
+      pilot.session_store.save(session=pilot.session, driver=pilot.browser.driver)
     # ----- comment this block out if these things should be done manually ----------
 
+class GooglePlayManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
+  @traced
+  def attempt(self, pilot: GooglePlayPilot):
+    yield OpenConsoleManeuver()
+
     # If the OpenClassicPlayConsole isn't working, or is not to be used, these things need to be done manually:
     # 1. click on the "Use classic Play Console" button
     # 2. copy the url in the new browser window
@@ -317,31 +577,23 @@ class GooglePlayManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
     # 4. re-select the client account
     # 5. enter "C" for "Continue" in the console
 
-    yield ClickXPathSequenceManeuver(xpaths=[
+    yield click_xpaths(pilot, [
       # f"//a/descendant::span[text()='{pilot.company_name}']",
       f"//a/descendant::div[text()='{pilot.app_id}']",
       "//button/descendant::span[text()='User acquisition']",
       "//a/descendant::span[text()='Acquisition reports']",
     ])
 
-    sleep(5)
-    date_keys = {'apcs', 'apce'}
-    url_parts = [p.split('=') for p in pilot.browser.current_url.split('&')]
-
-    now = datetime.datetime.utcnow()
-    for p in url_parts:
-      if p[0] in date_keys:
-        p[1] = datetime.datetime.strftime(now, '%Y-%m-%d')
-
-    url_parts.append(['ts', 'FIFTEEN_DAYS'])
-    new_url = '&'.join(['='.join(p) for p in url_parts])
-    yield NavigationManeuver(url=new_url)
+    pilot.waits.wait_for('acquisition_report', lambda: 'apcs=' in pilot.browser.current_url and report_rendered(pilot)(), required=True)
+    now = datetime.datetime.strftime(datetime.datetime.utcnow(), '%Y-%m-%d')
+    new_url = replace_url_parameters(pilot.browser.current_url, {'apcs': now, 'apce': now, 'ts': 'FIFTEEN_DAYS'})
+    yield navigation(pilot, new_url)
 
-    sleep(10)
-    url_parts = [p.split('=') for p in pilot.browser.current_url.split('&')]
-    for p in url_parts:
-      if p[0] in date_keys:
-        url_date = p[1]
+    # the console rewrites apcs/apce from today to the last day with data once it has resolved the range
+    pilot.waits.wait_for('last_date_available', lambda: url_parameters(pilot.browser.current_url).get('apce', now) != now, required=True)
+    pilot.waits.wait_for('report_rendered', report_rendered(pilot), required=True)
+    parameters = url_parameters(pilot.browser.current_url)
+    url_date = parameters.get('apce', parameters.get('apcs'))
 
     last_date_available = datetime.datetime.strptime(url_date, '%Y-%m-%d')
     data_frame = pd.DataFrame()
@@ -353,27 +605,36 @@ class GooglePlayManeuver(OrdnanceManeuver[GooglePlayPilot, pd.DataFrame]):
     data_frame.to_csv(str(pilot.download_path / 'GooglePlayScraper.csv'))
     pilot.ordnance = data_frame
 
-    def month_delta(date, delta):
-      m, y = (date.month+delta) % 12, date.year + ((date.month)+delta-1) // 12
-      if not m: m = 12
-      d = min(date.day, calendar.monthrange(y, m)[1])
-      return date.replace(day=d,month=m, year=y)
-
-    yield DownloadBulkExportManeuver(
-      download_dates=[
-        last_date_available,
-        month_delta(last_date_available, -1),
-      ]
-    )
-
-    processor = (yield ProcessGooglePlayDataManeuver()).deploy()
-    yield SendDataToSlackManeuver(
-      data_path=processor.processed_data_path,
-      min_date=processor.min_processed_date,
-      max_date=processor.max_processed_date
-    )
+    download_dates = [
+      last_date_available,
+      month_delta(last_date_available, -1),
+    ]
+    if pilot.export_source != 'console':
+      yield FetchBucketExportManeuver(download_dates=download_dates)
+    else:
+      yield DownloadBulkExportManeuver(download_dates=download_dates)
+
+    if pilot.pipeline:
+      # processing and delivery continue on the pipeline while the browser moves on to the next app
+      pilot.pipeline.submit(pilot.app_id, lambda: process_and_send_data(pilot))
+    else:
+      processor = (yield ProcessGooglePlayDataManeuver()).deploy()
+      yield SendDataToSlackManeuver(
+        data_path=processor.processed_data_path,
+        min_date=processor.min_processed_date,
+        max_date=processor.max_processed_date
+      )
 
-if __name__ == '__main__':
-  enqueue_maneuver(GooglePlayManeuver())
-else:
-  enqueue_maneuver(DownloadBulkExportManeuver())
+    (pilot.download_path / 'parse_report.json').write_text(json.dumps(pilot.parse_timings.report(), indent=2))
+    (pilot.download_path / 'wait_report.json').write_text(json.dumps(pilot.waits.report(), indent=2))
+    if pilot.lean_browsing:
+      pilot.lean_browsing.sample(pilot.browser.driver)
+      (pilot.download_path / 'lean_browsing_report.json').write_text(json.dumps(pilot.lean_browsing.report(since=pilot.lean_browsing_start), indent=2))
+    if pilot.pacing:
+      (pilot.download_path / 'pacing_report.json').write_text(json.dumps(pilot.pacing.report(), indent=2))
+
+if 'enqueue_maneuver' in globals():
+  if __name__ == '__main__':
+    enqueue_maneuver(GooglePlayManeuver())
+  else:
+    enqueue_maneuver(DownloadBulkExportManeuver())
@@ -0,0 +1,41 @@
+import calendar
+import datetime
+
+from typing import Dict, Optional
+
+def month_difference(from_date: datetime.date, to_date: datetime.date) -> int:
+  return (to_date.year - from_date.year) * 12 + to_date.month - from_date.month
+
+def month_delta(date: datetime.date, delta: int) -> datetime.date:
+  m, y = (date.month+delta) % 12, date.year + ((date.month)+delta-1) // 12
+  if not m: m = 12
+  d = min(date.day, calendar.monthrange(y, m)[1])
+  return date.replace(day=d,month=m, year=y)
+
+def url_parameters(url: str) -> Dict[str, str]:
+  return {p[0]: p[1] for p in [p.split('=', 1) for p in url.split('&')] if len(p) == 2}
+
+def replace_url_parameters(url: str, parameters: Dict[str, Optional[str]]) -> str:
+  url_parts = [p.split('=', 1) for p in url.split('&')]
+  replaced = set()
+  new_parts = []
+  for p in url_parts:
+    if len(p) == 2 and p[0] in parameters:
+      replaced.add(p[0])
+      if parameters[p[0]] is None:
+        continue
+      p = [p[0], parameters[p[0]]]
+    new_parts.append(p)
+
+  for key, value in parameters.items():
+    if key not in replaced and value is not None:
+      new_parts.append([key, value])
+  return '&'.join(['='.join(p) for p in new_parts])
+
+def cohort_url(url: str, start_date: datetime.date, end_date: Optional[datetime.date]=None) -> str:
+  end_date = end_date if end_date else start_date
+  return replace_url_parameters(url, {
+    'apcs': start_date.strftime('%Y-%m-%d'),
+    'apce': end_date.strftime('%Y-%m-%d'),
+    'ts': None,
+  })
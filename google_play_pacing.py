@@ -0,0 +1,93 @@
+import random
+import time
+
+from typing import Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+class PacingController:
+  min_interval: float
+  max_interval: float
+  additive_step: float
+  backoff_factor: float
+  slow_seconds: float
+  retries: int
+  retry_base_seconds: float
+  retry_max_seconds: float
+  interval: float
+  latencies: Dict[str, List[float]]
+  failures: Dict[str, int]
+  retry_counts: Dict[str, int]
+  slowdowns: int
+  _last_action: Optional[float]
+
+  def __init__(self, min_interval: float=0.0, max_interval: float=10.0, initial_interval: float=0.5, additive_step: float=0.05, backoff_factor: float=2.0, slow_seconds: float=10.0, retries: int=2, retry_base_seconds: float=1.0, retry_max_seconds: float=30.0):
+    self.min_interval = min_interval
+    self.max_interval = max_interval
+    self.additive_step = additive_step
+    self.backoff_factor = backoff_factor
+    self.slow_seconds = slow_seconds
+    self.retries = retries
+    self.retry_base_seconds = retry_base_seconds
+    self.retry_max_seconds = retry_max_seconds
+    self.interval = min(max(initial_interval, min_interval), max_interval)
+    self.latencies = {}
+    self.failures = {}
+    self.retry_counts = {}
+    self.slowdowns = 0
+    self._last_action = None
+
+  def wait(self):
+    if self._last_action is not None:
+      remaining = self._last_action + self.interval - time.monotonic()
+      if remaining > 0:
+        time.sleep(remaining)
+    self._last_action = time.monotonic()
+
+  def record(self, action: str, latency: float, succeeded: bool):
+    self.latencies.setdefault(action, []).append(latency)
+    if not succeeded:
+      self.failures[action] = self.failures.get(action, 0) + 1
+
+    # AIMD on the action rate: speed up additively while the console keeps up, back off multiplicatively on failures or slow responses
+    if succeeded and latency < self.slow_seconds:
+      self.interval = max(self.min_interval, self.interval - self.additive_step)
+    else:
+      self.interval = min(self.max_interval, max(self.interval * self.backoff_factor, self.additive_step))
+      self.slowdowns += 1
+
+  def retry_delay(self, attempt: int) -> float:
+    return min(self.retry_base_seconds * 2 ** attempt, self.retry_max_seconds) * (0.5 + random.random())
+
+  def run(self, action: str, perform: Callable[[], T], idempotent: bool=True) -> T:
+    attempts = self.retries + 1 if idempotent else 1
+    for attempt in range(attempts):
+      self.wait()
+      start = time.monotonic()
+      try:
+        result = perform()
+      except Exception:
+        self.record(action, time.monotonic() - start, succeeded=False)
+        if attempt == attempts - 1:
+          raise
+        self.retry_counts[action] = self.retry_counts.get(action, 0) + 1
+        time.sleep(self.retry_delay(attempt))
+        continue
+      self.record(action, time.monotonic() - start, succeeded=True)
+      return result
+
+  def report(self) -> Dict[str, any]:
+    return {
+      'interval_seconds': round(self.interval, 3),
+      'slowdowns': self.slowdowns,
+      'actions': {
+        action: {
+          'count': len(latencies),
+          'failures': self.failures.get(action, 0),
+          'retries': self.retry_counts.get(action, 0),
+          'mean_seconds': round(sum(latencies) / len(latencies), 3),
+          'max_seconds': round(max(latencies), 3),
+        }
+        for action, latencies in sorted(self.latencies.items())
+      },
+    }
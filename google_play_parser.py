@@ -1,30 +1,148 @@
 import re
+import time
+import datetime
 import pandas as pd
+import lxml.html
 
+from contextlib import contextmanager
+from lxml import etree
 from raspador import OrdnanceParser, XPath
+from typing import Dict, Generator, List, Optional
+
+listing_title = 'Number of people that have never installed your app who visited your store listing'
+first_time_installer_title = 'Number of users who installed your app for the first time.'
+
+listing_elements_xpath = etree.XPath(f"//div[contains(@title, '{listing_title}')]")
+first_time_installer_elements_xpath = etree.XPath(f"//div[contains(@title, '{first_time_installer_title}')]")
+row_first_time_installer_xpath = etree.XPath(f".//div[contains(@title, '{first_time_installer_title}')]")
+row_texts_xpath = etree.XPath('.//text()')
+date_panel_days_xpath = etree.XPath('//a')
+date_panel_months_xpath = etree.XPath('//span')
+date_not_available_text = 'Date not available'
+# relative to the date panel, so it can be appended to the panel's xpath in the live page
+date_not_available_xpath = f"descendant::*[contains(text(), '{date_not_available_text}')]"
+date_not_available_elements_xpath = etree.XPath(f'//{date_not_available_xpath}')
+
+day_pattern = re.compile(r'^[0-9]{1,2}$')
+month_and_year_pattern = re.compile(r'^\w+ [0-9]{4}$')
+
+class ParseTimings:
+  timings: Dict[str, List[float]]
+
+  def __init__(self):
+    self.timings = {}
+
+  @contextmanager
+  def timed(self, name: str) -> Generator[None, None, None]:
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.timings.setdefault(name, []).append(time.perf_counter() - start)
+
+  def report(self) -> Dict[str, Dict[str, float]]:
+    return {
+      name: {
+        'count': len(timings),
+        'total_seconds': round(sum(timings), 6),
+        'max_seconds': round(max(timings), 6),
+      }
+      for name, timings in self.timings.items()
+    }
+
+def parse_html(source: str) -> etree.ElementBase:
+  return lxml.html.fromstring(source)
 
 class DateNotAvailableParser(OrdnanceParser[XPath]):
   def parse(self):
-    element = self.soup.find(text=re.compile(r'Date not available'))
-    self.ordnance = self.xpath_for_element(element=element) if element else None
+    # the marker is usually absent while paging, so skip building a tree for the common case
+    if date_not_available_text not in self.source:
+      self.ordnance = None
+      return self
+
+    self.ordnance = date_not_available_xpath if date_not_available_elements_xpath(parse_html(self.source)) else None
     return self
 
 class AcquisitionReportParser(OrdnanceParser[pd.DataFrame]):
   def parse(self):
-    listing_elements = self.soup.find_all('div', {'title': re.compile(r'Number of people that have never installed your app who visited your store listing')})
-    first_time_installer_elements = self.soup.find_all('div', {'title': re.compile(r'Number of users who installed your app for the first time.')})
+    tree = parse_html(self.source)
+    listing_elements = listing_elements_xpath(tree)
+    first_time_installer_elements = first_time_installer_elements_xpath(tree)
 
     acquisition_data = [{
       'acquisition_channel': 'search',
-      'store_listing_visitors': listing_elements[2].text,
-      'first_time_installers': first_time_installer_elements[2].text,
+      'store_listing_visitors': listing_elements[2].text_content(),
+      'first_time_installers': first_time_installer_elements[2].text_content(),
     }, {
       'acquisition_channel': 'explore',
-      'store_listing_visitors': listing_elements[3].text,
-      'first_time_installers': first_time_installer_elements[3].text,
+      'store_listing_visitors': listing_elements[3].text_content(),
+      'first_time_installers': first_time_installer_elements[3].text_content(),
     }]
     df = pd.DataFrame(acquisition_data)
     df.store_listing_visitors = df.store_listing_visitors.str.replace(',', '').astype(int)
     df.first_time_installers = df.first_time_installers.str.replace(',', '').astype(int)
     self.ordnance = df
     return self
+
+class AcquisitionReportRangeParser(OrdnanceParser[pd.DataFrame]):
+  date_formats = ['%b %d, %Y', '%d %b %Y', '%B %d, %Y', '%d %B %Y', '%Y-%m-%d']
+  date_pattern = re.compile(r'^\s*(\w{3,9} [0-9]{1,2}, [0-9]{4}|[0-9]{1,2} \w{3,9} [0-9]{4}|[0-9]{4}-[0-9]{2}-[0-9]{2})\s*$')
+
+  @classmethod
+  def parse_date(cls, text: str) -> Optional[datetime.date]:
+    for date_format in cls.date_formats:
+      try:
+        return datetime.datetime.strptime(text, date_format).date()
+      except ValueError:
+        pass
+    return None
+
+  def parse(self):
+    rows = []
+    for listing_element in listing_elements_xpath(parse_html(self.source)):
+      row = next(listing_element.iterancestors('tr'), None)
+      if row is None:
+        continue
+      installer_elements = row_first_time_installer_xpath(row)
+      row_texts = [str(t) for t in row_texts_xpath(row)]
+      date_text = next((t for t in row_texts if self.date_pattern.match(t)), None)
+      if not installer_elements or date_text is None:
+        continue
+
+      row_text = ' '.join(row_texts).lower()
+      channel = 'search' if 'search' in row_text else 'explore' if 'explore' in row_text else None
+      date = self.parse_date(date_text.strip())
+      if channel is None or date is None:
+        continue
+
+      rows.append({
+        'acquisition_channel': channel,
+        'store_listing_visitors': listing_element.text_content(),
+        'first_time_installers': installer_elements[0].text_content(),
+        'date': date,
+      })
+
+    df = pd.DataFrame(rows, columns=['acquisition_channel', 'store_listing_visitors', 'first_time_installers', 'date'])
+    df.store_listing_visitors = df.store_listing_visitors.str.replace(',', '').astype(int)
+    df.first_time_installers = df.first_time_installers.str.replace(',', '').astype(int)
+    self.ordnance = df.drop_duplicates(subset=['date', 'acquisition_channel'], keep='first')
+    return self
+
+class DatePanelParser(OrdnanceParser[datetime.date]):
+  def parse(self):
+    tree = parse_html(self.source)
+    month_and_year_texts = [e.text_content() for e in date_panel_months_xpath(tree) if month_and_year_pattern.match(e.text_content())]
+    self.ordnance = datetime.datetime.strptime(month_and_year_texts[-1].strip(), '%B %Y').date() if month_and_year_texts else None
+    return self
+
+class LastDayAvailableParser(OrdnanceParser[datetime.date]):
+  def parse(self):
+    tree = parse_html(self.source)
+    day_texts = [e.text_content() for e in date_panel_days_xpath(tree) if day_pattern.match(e.text_content())]
+    month_and_year_texts = [e.text_content() for e in date_panel_months_xpath(tree) if month_and_year_pattern.match(e.text_content())]
+    if day_texts and month_and_year_texts:
+      last_date_text = f'{day_texts[-1]} {month_and_year_texts[-1]}'.strip()
+      self.ordnance = datetime.datetime.strptime(last_date_text, '%d %B %Y').date()
+    else:
+      self.ordnance = None
+    return self
@@ -1,19 +1,64 @@
 import pandas as pd
 
 from raspador import OrdnancePilot, UserInteractor, BrowserInteractor
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, TypeVar
 from pathlib import Path
+from .google_play_wait import WaitBudget
+from .google_play_parser import ParseTimings
+from .google_play_scheduler import AccountSession
+from .google_play_session import GooglePlaySessionStore
+from .google_play_cache import ScrapedDayCache
+from .google_play_checkpoint import ScrapeCheckpoint, interrupted_scrape_path, scrape_checkpoint_file_name
+from .google_play_trace import GooglePlayTracer
+from .google_play_pipeline import PostScrapePipeline
+from .google_play_pacing import PacingController
+from .google_play_lean import LeanBrowsingProfile
+from .google_play_delivery import DeliverySink, delivery_sink_for
+from .google_play_storage import ReportStorageClient, GCSReportStorageClient, LocalReportStorageClient
+
+T = TypeVar('T')
 
 class GooglePlayPilot(OrdnancePilot[pd.DataFrame]):
   config: Dict[str, any]
-  sign_in_wait = 3.0
+  waits: WaitBudget
+  parse_timings: ParseTimings
+  session: AccountSession
+  tracer: GooglePlayTracer
+  pipeline: Optional[PostScrapePipeline]
+  lean_browsing_start: int
   _download_path: Optional[Path]
 
-  def __init__(self, config: Dict[str, any], user: UserInteractor, browser: BrowserInteractor):
+  def __init__(self, config: Dict[str, any], user: UserInteractor, browser: BrowserInteractor, session: Optional[AccountSession]=None, pipeline: Optional[PostScrapePipeline]=None):
     self.config = config
+    self.pipeline = pipeline
+    self.session = session if session else AccountSession(email=config['email'], browser=browser)
+    if 'pacing' in config and self.session.pacing is None:
+      # pacing is tracked per account, so every app flown on this session shares what the console tolerates
+      self.session.pacing = PacingController(**config['pacing'])
+    if self.session.lean_browsing is None:
+      # blocking is set on the browser, which the session's later apps keep using
+      self.session.lean_browsing = LeanBrowsingProfile.from_config(config.get('lean_browsing'))
+    # pages sampled for earlier apps on the session stay out of this app's report
+    self.lean_browsing_start = len(self.session.lean_browsing.pages) if self.session.lean_browsing else 0
+    self.waits = WaitBudget(timeouts=config.get('wait_timeouts'))
+    self.parse_timings = ParseTimings()
     self._download_path = None
+    self.tracer = GooglePlayTracer(app_id=config.get('app_id'), path_factory=lambda: self.download_path / 'trace.jsonl')
     super().__init__(user=user, browser=browser)
   
+  @property
+  def pacing(self) -> Optional[PacingController]:
+    return self.session.pacing
+
+  @property
+  def lean_browsing(self) -> Optional[LeanBrowsingProfile]:
+    return self.session.lean_browsing
+
+  def paced(self, action: str, perform: Callable[[], T], idempotent: bool=True) -> T:
+    if self.pacing is None:
+      return perform()
+    return self.pacing.run(action, perform, idempotent=idempotent)
+
   @property
   def email(self) -> str:
     return self.config['email']
@@ -22,9 +67,27 @@ class GooglePlayPilot(OrdnancePilot[pd.DataFrame]):
   def password(self) -> str:
     return self.config['password']
   
+  @property
+  def sign_in_url(self) -> str:
+    return self.config.get('sign_in_url', 'https://accounts.google.com/signin/v2/identifier?service=androiddeveloper&passive=true&continue=https%3A%2F%2Fplay.google.com%2Fconsole%2Fdeveloper%2F')
+
+  @property
+  def console_home_url(self) -> str:
+    return self.config.get('console_home_url', 'https://play.google.com/console/developer/')
+
+  @property
+  def session_store(self) -> Optional[GooglePlaySessionStore]:
+    if not self.config.get('persist_sessions'):
+      return None
+    return GooglePlaySessionStore(max_age=self.config.get('session_max_age'))
+
   @property
   def company_name(self) -> str:
     return self.config['company_name']
+
+  @property
+  def company_name_class(self) -> str:
+    return self.config.get('company_name_class', 'business-name')
   
   @property
   def app_id(self) -> str:
@@ -34,10 +97,111 @@ class GooglePlayPilot(OrdnancePilot[pd.DataFrame]):
   def days_back(self) -> int:
     return self.config['days']
   
+  @property
+  def date_navigation(self) -> str:
+    return self.config.get('date_navigation', 'calendar')
+
+  @property
+  def range_scrape_days(self) -> int:
+    return self.config.get('range_scrape_days', 0)
+
+  @property
+  def scrape_cache(self) -> Optional[ScrapedDayCache]:
+    if not self.config.get('cache_scraped_days'):
+      return None
+    return ScrapedDayCache(cache_path=Path(f'output/google_play/{self.app_id}/scraped_days'), freshness_days=self.scrape_freshness_days)
+
+  @property
+  def scrape_freshness_days(self) -> int:
+    return self.config.get('scrape_freshness_days', 3)
+
+  @property
+  def range_url_parameters(self) -> Dict[str, Optional[str]]:
+    return self.config.get('range_url_parameters', {})
+
+  @property
+  def browser_download_path(self) -> Path:
+    # only used by browsers that cannot be redirected at runtime; point it at the directory the browser was launched with
+    return Path(self.config.get('browser_download_path', '.'))
+
+  @property
+  def download_retries(self) -> int:
+    return self.config.get('download_retries', 2)
+
+  @property
+  def export_source(self) -> str:
+    export_source = self.config.get('export_source', 'console')
+    if export_source not in ['console', 'gcs', 'local']:
+      raise ValueError('Unsupported export source.', export_source)
+    return export_source
+
+  @property
+  def report_storage_client(self) -> Optional[ReportStorageClient]:
+    export_source = self.export_source
+    if export_source == 'gcs':
+      return GCSReportStorageClient(bucket_name=self.config['report_bucket'], credentials_path=self.config.get('report_credentials_path'))
+    if export_source == 'local':
+      return LocalReportStorageClient(root_path=Path(self.config['report_storage_path']))
+    return None
+
+  @property
+  def report_mirror_path(self) -> Path:
+    return Path(f'output/google_play/{self.app_id}/exports')
+
   @property
   def slackbot_api_token(self) -> str:
     return self.config['slackbot_api_token']
   
+  @property
+  def processing_cache_path(self) -> Optional[Path]:
+    if not self.config.get('incremental_processing'):
+      return None
+    return Path(f'output/google_play/{self.app_id}/cache')
+
+  @property
+  def processing_cache_format(self) -> str:
+    return self.config.get('processing_cache_format', 'parquet')
+
+  @property
+  def processing_engine(self) -> str:
+    return self.config.get('processing_engine', 'pandas')
+
+  @property
+  def processing_engine_options(self) -> Dict[str, any]:
+    return self.config.get('processing_engine_options', {})
+
+  @property
+  def processing_read_workers(self) -> int:
+    return self.config.get('processing_read_workers', 1)
+
+  @property
+  def processing_chunk_size(self) -> Optional[int]:
+    return self.config.get('processing_chunk_size')
+
+  @property
+  def processing_compact(self) -> bool:
+    return self.config.get('compact_processing', False)
+
+  @property
+  def output_format(self) -> str:
+    return self.config.get('output_format', 'csv')
+
+  @property
+  def output_partitioned(self) -> bool:
+    return self.config.get('output_partitioned', False)
+
+  @property
+  def output_compact(self) -> bool:
+    return self.config.get('output_compact', False)
+
+  @property
+  def zip_compression_level(self) -> int:
+    return self.config.get('zip_compression_level', 6)
+
+  @property
+  def delivery_sink(self) -> DeliverySink:
+    return delivery_sink_for(self.config)
+
   @property
   def download_path(self) -> Path:
     if self._download_path:
@@ -46,8 +210,17 @@ class GooglePlayPilot(OrdnancePilot[pd.DataFrame]):
     user_directory_path = Path(f'output/google_play/{self.app_id}')
     if not user_directory_path.exists():
       user_directory_path.mkdir()
+
+    resume_path = interrupted_scrape_path(user_directory_path, max_age_days=self.scrape_freshness_days) if self.config.get('resume_scrapes', False) else None
+    if resume_path:
+      self._download_path = resume_path
+      return resume_path
   
     download_path = user_directory_path / self.user.date_file_name()
     download_path.mkdir()
     self._download_path = download_path
-    return download_path
\ No newline at end of file
+    return download_path
+
+  @property
+  def scrape_checkpoint(self) -> ScrapeCheckpoint:
+    return ScrapeCheckpoint(path=self.download_path / scrape_checkpoint_file_name)
\ No newline at end of file
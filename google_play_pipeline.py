@@ -0,0 +1,30 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# stages run on threads, so they overlap with the browser's I/O bound scraping, but CPU bound processing
+# of two apps still contends for the GIL and does not run faster than it would one after the other
+class PostScrapePipeline:
+  max_workers: int
+  jobs: Dict[str, List[Future]]
+  _executor: ThreadPoolExecutor
+
+  def __init__(self, max_workers: int=2):
+    self.max_workers = max_workers
+    self.jobs = {}
+    self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='google-play-pipeline')
+
+  def submit(self, app_id: str, stage: Callable[[], any]) -> Future:
+    future = self._executor.submit(stage)
+    self.jobs.setdefault(app_id, []).append(future)
+    return future
+
+  def drain(self) -> Dict[str, Optional[BaseException]]:
+    failures = {}
+    for app_id, futures in self.jobs.items():
+      failures[app_id] = next((f.exception() for f in futures if f.exception() is not None), None)
+    self.jobs = {}
+    return failures
+
+  def shutdown(self):
+    self.drain()
+    self._executor.shutdown(wait=True)
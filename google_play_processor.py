@@ -1,12 +1,68 @@
 import pandas as pd
 import numpy as np
-import os
-import shutil
-import re
-from shutil import unpack_archive, move
+import resource
+import sys
 from datetime import date
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
+from .google_play_cache import GooglePlayExportCache
+from .google_play_ingestion import ExportKind, ExportSource, GooglePlayExportReader, classify_export_sources, export_sources
+from .google_play_writer import GooglePlayWriter, CSVWriter
+
+export_columns = {
+  ExportKind.country: {'Date':'date', 'Package Name': 'app_name',  'Country': 'country_code', 'Store Listing Visitors': 'total_impressions', 'Installers': 'total_downloads'},
+  ExportKind.play_country: {'Date':'date', 'Package Name': 'app_name', 'Country (Play Store)': 'country_code', 'Store Listing Visitors': 'organic_impressions', 'Installers': 'organic_downloads'},
+  ExportKind.channel: {'Date':'date', 'Package Name': 'app_name', 'Acquisition Channel': 'source', 'Store Listing Visitors': 'impressions', 'Installers': 'downloads'},
+}
+
+country_sources = {
+  'organic': 'Play Store (organic)',
+  'inorganic': 'Inorganic',
+}
+
+compact_dimensions = ['app_name', 'country_code', 'source']
+compact_metrics = [
+  'impressions', 'downloads',
+  'total_impressions', 'total_downloads',
+  'organic_impressions', 'organic_downloads',
+  'inorganic_impressions', 'inorganic_downloads',
+]
+
+def day_index(df: pd.DataFrame) -> pd.MultiIndex:
+  return pd.MultiIndex.from_arrays([df['date'], df['app_name'].astype(str)], names=['date', 'app_name'])
+
+def reconciliation_report(overlap: pd.MultiIndex, export_only: pd.MultiIndex, scrape_only: pd.MultiIndex, replaced_rows: int) -> Dict[str, Dict[str, any]]:
+  def app_dates(days: pd.MultiIndex) -> Dict[str, List[str]]:
+    dates = {}
+    for day, app_name in days:
+      dates.setdefault(app_name, []).append(day.strftime('%Y-%m-%d'))
+    return {a: sorted(d) for a, d in dates.items()}
+
+  overlap_dates = app_dates(overlap)
+  export_only_dates = app_dates(export_only)
+  scrape_only_dates = app_dates(scrape_only)
+  apps = {}
+  for app_name in sorted(set(overlap_dates) | set(export_only_dates) | set(scrape_only_dates)):
+    days = overlap_dates.get(app_name, [])
+    expected = pd.date_range(days[0], days[-1]).strftime('%Y-%m-%d') if days else []
+    apps[app_name] = {
+      'overlap_days': len(days),
+      'first_day': days[0] if days else None,
+      'last_day': days[-1] if days else None,
+      'gap_days': sorted(set(expected) - set(days)),
+      'dropped_export_days': export_only_dates.get(app_name, []),
+      'dropped_scrape_days': scrape_only_dates.get(app_name, []),
+    }
+  return {
+    'replaced_export_rows': replaced_rows,
+    'apps': apps,
+  }
+
+def peak_rss_bytes() -> int:
+  # the high-water mark of the whole process, so it includes everything that ran before processing, e.g. the scrape
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # linux reports kilobytes, macOS bytes
+  return peak if sys.platform == 'darwin' else peak * 1024
 
 class GooglePlayProcessor:
   source_directory_path: Path
@@ -16,9 +72,23 @@ class GooglePlayProcessor:
   country_downloads_df: Optional[pd.DataFrame]
   channel_impressions_df: Optional[pd.DataFrame]
   channel_downloads_df: Optional[pd.DataFrame]
-
-  def __init__(self, source_directory_path: Path, processed_data_path: Optional[Path]=None):
+  read_workers: int
+  chunk_size: Optional[int]
+  cache: Optional[GooglePlayExportCache]
+  writer: GooglePlayWriter
+  compact: bool
+  process_peak_rss_bytes: Optional[int]
+  reconciliation_report: Optional[Dict[str, any]]
+
+  def __init__(self, source_directory_path: Path, processed_data_path: Optional[Path]=None, read_workers: int=1, chunk_size: Optional[int]=None, cache_path: Optional[Path]=None, cache_format: str='parquet', writer: Optional[GooglePlayWriter]=None, compact: bool=False):
     self.source_directory_path = source_directory_path
+    self.read_workers = read_workers
+    self.chunk_size = chunk_size
+    self.compact = compact
+    self.process_peak_rss_bytes = None
+    self.reconciliation_report = None
+    self.cache = GooglePlayExportCache(cache_path=cache_path, cache_format=cache_format) if cache_path else None
+    self.writer = writer if writer else CSVWriter()
     self.processed_data_path = processed_data_path if processed_data_path else source_directory_path / Path('processed')
 
     self.country_impressions_df = pd.DataFrame()
@@ -40,6 +110,22 @@ class GooglePlayProcessor:
     ]
 
     return [df for df in data_frames if not df.empty]
+
+  @property
+  def memory_report(self) -> Dict[str, any]:
+    return {
+      'compact': self.compact,
+      'process_peak_rss_bytes': self.process_peak_rss_bytes,
+      'frame_bytes': {
+        name: int(df.memory_usage(index=True, deep=True).sum())
+        for name, df in [
+          ('country-impressions', self.country_impressions_df),
+          ('country-downloads', self.country_downloads_df),
+          ('channel-impressions', self.channel_impressions_df),
+          ('channel-downloads', self.channel_downloads_df),
+        ]
+      },
+    }
   
   @property
   def min_processed_date(self) -> Optional[date]:
@@ -53,122 +139,171 @@ class GooglePlayProcessor:
     if self.processed_data_frames:
       return max([d.date.max() for d in self.processed_data_frames]).date()
 
-  def process(self):
-    #List of all files in inputs
-    full_item_list = [e for e in os.listdir(self.source_dir)]
-    zip_files = [x for x in full_item_list if re.compile('zip').findall(x)]
-
-    for z in zip_files:
-      unpack_archive(self.source_dir+z, self.source_dir)
-
-    #Re-set full item list
-    full_item_list = [x for x in os.listdir(self.source_dir) if re.compile('csv').findall(x)]
-    gpc_scrape = [x for x in full_item_list if re.compile('GooglePlayScraper').findall(x)][0]
-
-    df_pc = pd.DataFrame()
-    df_c = pd.DataFrame()
-    df_ch = pd.DataFrame()
-
-    for i in [x for x in full_item_list if re.compile('play_country.csv').findall(x)]:
-        df = pd.read_csv(self.source_dir+i, encoding = 'utf-16', na_filter = False).astype({'Date': 'datetime64[ns]', 'Store Listing Visitors': 'float', 'Installers': 'float'})
-        df_pc = df.append(df_pc)
+  def export_files(self) -> Dict[ExportKind, List[ExportSource]]:
+    return classify_export_sources(export_sources(self.source_directory_path))
 
-    for i in [x for x in full_item_list if re.compile('country.csv').findall(x) and x not in [x for x in full_item_list if re.compile('play_country.csv').findall(x)]]:
-        df = pd.read_csv(self.source_dir+i, encoding = 'utf-16', na_filter = False).astype({'Date': 'datetime64[ns]', 'Store Listing Visitors': 'float', 'Installers': 'float'})
-        df_c = df.append(df_c)
-
-    for i in [x for x in full_item_list if re.compile('channel.csv').findall(x)]:
-        df = pd.read_csv(self.source_dir+i, encoding = 'utf-16', na_filter = False).astype({'Date': 'datetime64[ns]', 'Store Listing Visitors': 'float', 'Installers': 'float'})
-        df_ch = df.append(df_ch)
+  def process(self):
+    export_files = self.export_files()
+    gpc_scrapes = export_files[ExportKind.scraper]
 
+    reader = GooglePlayExportReader(max_workers=self.read_workers, chunk_size=self.chunk_size, compact=self.compact)
 
     #--------Country--------------------------------------------------------------------------------------------
-    df_c = df_c.loc[:, 'Date':'Installers'] #take columns from Date up until (and including) Installers
-    df_c = df_c.rename(columns={'Date':'date', 'Package Name': 'app_name',  'Country': 'country_code', 'Store Listing Visitors': 'total_impressions', 'Installers': 'total_downloads'})
-
-    df_c['country_code'] = np.where(df_c['country_code']=='', 'XX', df_c['country_code'])
-
-    aggregations = { 'total_impressions':'sum', 'total_downloads': 'sum'}
-    df_c = df_c.groupby(['date', 'app_name', 'country_code'], as_index=False).agg(aggregations)
-
-
-    df_pc = df_pc.loc[:, 'Date':'Installers'] #take columns from Date up until (and including) Installers
-    df_pc = df_pc.rename(columns={'Date':'date', 'Package Name': 'app_name', 'Country (Play Store)': 'country_code', 'Store Listing Visitors': 'organic_impressions', 'Installers': 'organic_downloads'})
-
-    df_pc['country_code'] = np.where(df_pc['country_code']=='', 'XX', df_pc['country_code'])
-
-
-    aggregations = { 'organic_impressions':'sum', 'organic_downloads': 'sum'}
-    df_pc = df_pc.groupby(['date', 'app_name', 'country_code'], as_index=False).agg(aggregations)
+    df_c = self._read_reduced_exports(reader, ExportKind.country, export_files[ExportKind.country])
+    df_pc = self._read_reduced_exports(reader, ExportKind.play_country, export_files[ExportKind.play_country])
 
     master_c = df_c.merge(df_pc, on = ['date', 'app_name', 'country_code'], how = 'left') .fillna({'organic_impressions': 0,'organic_downloads': 0})
+    del df_c, df_pc
+
+    if self.compact:
+      # one temporary per metric, clipped in place, instead of a difference and a clipped copy
+      for metric in ['impressions', 'downloads']:
+        inorganic = master_c[f'total_{metric}'] - master_c[f'organic_{metric}']
+        inorganic.clip(lower=0, inplace=True)
+        master_c[f'inorganic_{metric}'] = inorganic
+      master_c['platform_id'] = np.int8(2)
+      master_c = self._compact_frame(master_c)
+    else:
+      master_c['inorganic_impressions'] = (master_c['total_impressions'] - master_c['organic_impressions']).clip(lower=0)
+      master_c['inorganic_downloads'] = (master_c['total_downloads'] - master_c['organic_downloads']).clip(lower=0)
+      master_c['platform_id'] = 2
 
-    master_c['inorganic_impressions'] = master_c['total_impressions'] - master_c['organic_impressions']
-    master_c['inorganic_downloads'] = master_c['total_downloads'] - master_c['organic_downloads']
-
-    master_c['inorganic_impressions'] = np.where(master_c['inorganic_impressions']<0, 0, master_c['inorganic_impressions'])
-    master_c['inorganic_downloads'] = np.where(master_c['inorganic_downloads']<0, 0, master_c['inorganic_downloads'])
-
-    master_c['platform_id'] = 2
-
-    country_impressions = pd.DataFrame()
-    country_downloads = pd.DataFrame()
-    for j in [x for x in master_c.columns.to_list() if x not in ('date', 'app_name', 'country_code', 'platform_id')]:
-        if j.split('_')[0] == 'total':
-            source = 'Total Play Store'
-        elif j.split('_')[0] == 'organic':
-            source = 'Play Store (organic)'
-        else:
-            source = 'Inorganic'
-        calc_type = j.split('_')[1]
-
-        df = master_c[['date', 'app_name', 'country_code', 'platform_id']]    
-        df[calc_type] = master_c[j]
-        df['source'] = source
-
-        if calc_type  == 'impressions':
-            country_impressions = country_impressions.append(df, sort=True)    
-        if calc_type  == 'downloads':
-            country_downloads = country_downloads.append(df, sort=True)
-
-    country_impressions = country_impressions[country_impressions['source'] != 'Total Play Store']
-    country_downloads = country_downloads[country_downloads['source'] != 'Total Play Store']
-
-    self.country_impressions_df = country_impressions[['date', 'impressions', 'platform_id', 'source', 'app_name', 'country_code']]
-    self.country_downloads_df = country_downloads[['date', 'downloads', 'platform_id', 'source', 'app_name', 'country_code']]
+    self.country_impressions_df = self._melt_country_sources(master_c, 'impressions')[['date', 'impressions', 'platform_id', 'source', 'app_name', 'country_code']]
+    self.country_downloads_df = self._melt_country_sources(master_c, 'downloads')[['date', 'downloads', 'platform_id', 'source', 'app_name', 'country_code']]
+    del master_c
 
     #--------Channel--------------------------------------------------------------------------------------------
-    df_ch = df_ch.loc[:, 'Date':'Installers'] #take columns from Date up until (and including) Installers
-    df_ch = df_ch.rename(columns={'Date':'date', 'Package Name': 'app_name', 'Acquisition Channel': 'source', 'Store Listing Visitors': 'impressions', 'Installers': 'downloads'})
-    try:
-        df_gpc = pd.read_csv(self.source_dir+gpc_scrape, na_filter = False).astype({'date': 'datetime64[ns]', 'store_listing_visitors': 'float', 'first_time_installers': 'float'})
-        df_gpc = df_gpc.rename(columns={'date':'date',   'app_id': 'app_name', 'acquisition_channel': 'source',   'store_listing_visitors': 'impressions',   'first_time_installers': 'downloads'})
-        df_gpc = df_gpc[df_gpc.date.isin(set(df_ch.date.unique()))] #filter GPC data to exported data
-        df_gpc = df_gpc[df_ch.columns.to_list()]
-
-        df_ch = df_ch[df_ch.date.isin(set(df_gpc.date.unique()))] #filter exported data to GPC
-        df_ch = df_ch[df_ch['source'] != 'Play Store (organic)']
-
-        df_ch = df_ch.append(df_gpc)
-    except:
-        print('GPC data not loaded or does not exist')
-        pass
+    df_ch = self._read_reduced_exports(reader, ExportKind.channel, export_files[ExportKind.channel])
+    if gpc_scrapes:
+      df_gpc = self._read_scrapes(gpc_scrapes)
+      df_ch = self._reconcile_channel_sources(df_ch, df_gpc[df_ch.columns.to_list()])
+    else:
+      print('GPC data does not exist')
+      self.reconciliation_report = {'replaced_export_rows': 0, 'apps': {}}
 
-    df_ch['platform_id'] = 2
+    if self.compact:
+      df_ch['platform_id'] = np.int8(2)
+      df_ch = self._compact_frame(df_ch)
+    else:
+      df_ch['platform_id'] = 2
 
     self.channel_impressions_df = df_ch[['date', 'impressions', 'platform_id', 'source', 'app_name']]
     self.channel_downloads_df = df_ch[['date', 'downloads', 'platform_id', 'source', 'app_name']]
+    self.process_peak_rss_bytes = peak_rss_bytes()
+
+  def _reconcile_channel_sources(self, df_ch: pd.DataFrame, df_gpc: pd.DataFrame) -> pd.DataFrame:
+    # only app days present in both sources are kept; there the scraped channels replace the exported organic total
+    ch_days = day_index(df_ch)
+    gpc_days = day_index(df_gpc)
+    ch_day_set = ch_days.unique()
+    gpc_day_set = gpc_days.unique()
+    overlap = ch_day_set.intersection(gpc_day_set)
+
+    ch_keys = pd.MultiIndex.from_arrays([ch_days.get_level_values(0), ch_days.get_level_values(1), df_ch['source'].astype(str)])
+    gpc_keys = pd.MultiIndex.from_arrays([gpc_days.get_level_values(0), gpc_days.get_level_values(1), df_gpc['source'].astype(str)])
+    replaced = (df_ch['source'] == country_sources['organic']).to_numpy() | ch_keys.isin(gpc_keys)
+    # an app without any scrape, e.g. from another directory in a batch, keeps its exports as a run of it alone would
+    scraped_apps = gpc_day_set.get_level_values(1).unique()
+    unscraped = ~ch_days.get_level_values(1).isin(scraped_apps)
+    ch_kept = (ch_days.isin(overlap) & ~replaced) | unscraped
+    gpc_kept = gpc_days.isin(overlap)
+
+    export_only = ch_day_set.difference(gpc_day_set)
+    self.reconciliation_report = reconciliation_report(
+      overlap=overlap,
+      export_only=export_only[export_only.get_level_values(1).isin(scraped_apps)],
+      scrape_only=gpc_day_set.difference(ch_day_set),
+      replaced_rows=int((ch_days.isin(overlap) & replaced).sum())
+    )
+    return pd.concat([df_ch[ch_kept], df_gpc[gpc_kept]])
+
+  def _compact_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+    # concatenating or merging categoricals with different categories falls back to object columns, so dimensions are recast after each combine
+    dtypes = {c: 'category' for c in compact_dimensions if c in df.columns and df[c].dtype.name != 'category'}
+    dtypes.update({c: 'Int32' for c in compact_metrics if c in df.columns and df[c].dtype.name != 'Int32'})
+    return df.astype(dtypes, copy=False) if dtypes else df
   
+  def _read_scrape(self, source: ExportSource) -> pd.DataFrame:
+    with source.open() as f:
+      return pd.read_csv(f, na_filter = False)
+
+  def _read_scrapes(self, sources: List[ExportSource]) -> pd.DataFrame:
+    df_gpc = pd.concat([self._read_scrape(s) for s in sources])
+    df_gpc = df_gpc.astype({'date': 'datetime64[ns]', 'store_listing_visitors': 'float', 'first_time_installers': 'float'})
+    df_gpc = df_gpc.rename(columns={'date':'date',   'app_id': 'app_name', 'acquisition_channel': 'source',   'store_listing_visitors': 'impressions',   'first_time_installers': 'downloads'})
+    # runs of the same app scrape overlapping days; the last run's scrape of a day is kept
+    return df_gpc.drop_duplicates(subset=['date', 'app_name', 'source'], keep='last')
+
+  def _read_reduced_exports(self, reader: GooglePlayExportReader, kind: ExportKind, sources: List[ExportSource]) -> pd.DataFrame:
+    if self.cache is not None:
+      content_hashes = {s.name: self.cache.content_hash(s) for s in sources}
+      stale_sources = [s for s in sources if not self.cache.is_current(source=s, kind=kind, content_hash=content_hashes[s.name])]
+      for source, df in zip(stale_sources, reader.read_each(stale_sources)):
+        self.cache.store(source=source, kind=kind, content_hash=content_hashes[source.name], df=self._reduce_exports(kind, df), rows=len(df))
+      self.cache.save_manifest()
+      return self._combine_reduced_exports(kind, self.cache.frames(kind, [s.name for s in sources]))
+
+    if not sources:
+      return self._combine_reduced_exports(kind, [])
+
+    if reader.chunk_size is None:
+      return self._reduce_exports(kind, reader.read_exports(sources))
+
+    # country chunks are reduced by their groupby before being combined, which bounds memory by the output size;
+    # channel rows are already at output grain, so chunking only avoids holding the unused export columns
+    return self._combine_reduced_exports(kind, [self._reduce_exports(kind, c) for c in reader.iter_export_chunks(sources)])
+
+  def _reduce_exports(self, kind: ExportKind, df: pd.DataFrame) -> pd.DataFrame:
+    df = df.loc[:, 'Date':'Installers'] #take columns from Date up until (and including) Installers
+    df = df.rename(columns=export_columns[kind])
+    if kind is ExportKind.channel:
+      return self._compact_frame(df) if self.compact else df
+
+    country_codes = df['country_code']
+    if isinstance(country_codes.dtype, pd.CategoricalDtype) and 'XX' not in country_codes.cat.categories:
+      # compact exports read countries as categoricals, which only accept values that are already categories
+      country_codes = country_codes.cat.add_categories('XX')
+    df['country_code'] = country_codes.mask(country_codes == '', 'XX')
+    return self._group_country_exports(kind, df)
+
+  def _combine_reduced_exports(self, kind: ExportKind, frames: List[pd.DataFrame]) -> pd.DataFrame:
+    df = pd.concat(frames) if frames else pd.DataFrame(columns=list(export_columns[kind].values())).astype({'date': 'datetime64[ns]'})
+    if kind is ExportKind.channel:
+      return self._compact_frame(df) if self.compact else df
+    return self._group_country_exports(kind, df)
+
+  def _group_country_exports(self, kind: ExportKind, df: pd.DataFrame) -> pd.DataFrame:
+    # observed=True keeps categorical keys from expanding into every date/app/country combination
+    df = df.groupby(['date', 'app_name', 'country_code'], as_index=False, observed=True).agg(self._country_aggregations(kind))
+    return self._compact_frame(df) if self.compact else df
+
+  def _country_aggregations(self, kind: ExportKind) -> Dict[str, str]:
+    return {c: 'sum' for c in export_columns[kind].values() if c not in ('date', 'app_name', 'country_code')}
+
+  def _melt_country_sources(self, master_c: pd.DataFrame, metric: str) -> pd.DataFrame:
+    source_columns = {f'{prefix}_{metric}': source for prefix, source in country_sources.items()}
+    df = master_c.melt(
+      id_vars=['date', 'app_name', 'country_code', 'platform_id'],
+      value_vars=list(source_columns.keys()),
+      var_name='source',
+      value_name=metric
+    )
+    if self.compact:
+      df['source'] = df['source'].astype('category').cat.rename_categories(source_columns)
+    else:
+      df['source'] = df['source'].map(source_columns)
+    return df
+
   def save(self):
     if len(self.processed_data_frames) != 4:
       raise ValueError('Data is not fully processed.')
 
     if not self.processed_data_path.exists():
       self.processed_data_path.mkdir()
-    else:
+    elif self.cache is None:
       raise ValueError('Proccessed data path already exists.', self.processed_data_path)
     
-    self.country_impressions_df.to_csv(f'{self.processed_data_path.absolute()}/country-impressions.csv', index=None)
-    self.country_downloads_df.to_csv(f'{self.processed_data_path.absolute()}/country-downloads.csv', index=None)
-    self.channel_impressions_df.to_csv(f'{self.processed_data_path.absolute()}/channel-impressions.csv', index=None)
-    self.channel_downloads_df.to_csv(f'{self.processed_data_path.absolute()}/channel-downloads.csv', index=None)
\ No newline at end of file
+    self.writer.write(self.country_impressions_df, self.processed_data_path, 'country-impressions')
+    self.writer.write(self.country_downloads_df, self.processed_data_path, 'country-downloads')
+    self.writer.write(self.channel_impressions_df, self.processed_data_path, 'channel-impressions')
+    self.writer.write(self.channel_downloads_df, self.processed_data_path, 'channel-downloads')
\ No newline at end of file
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .google_play_pipeline import PostScrapePipeline
+from .google_play_pacing import PacingController
+from .google_play_lean import LeanBrowsingProfile
+
+# accounts are flown concurrently, but only one of them can prompt on the terminal (2-factor sign in) at a time
+interaction_lock = threading.Lock()
+
+class AccountSession:
+  email: str
+  browser: any
+  signed_in: bool
+  console_urls: Dict[str, str]
+  pacing: Optional[PacingController]
+  lean_browsing: Optional[LeanBrowsingProfile]
+
+  def __init__(self, email: str, browser: any):
+    self.email = email
+    self.browser = browser
+    self.signed_in = False
+    self.console_urls = {}
+    self.pacing = None
+    self.lean_browsing = None
+
+class AppRunResult:
+  app_id: str
+  email: str
+  ordnance: Optional[any]
+  error: Optional[Exception]
+  duration: float
+
+  def __init__(self, app_id: str, email: str, ordnance: Optional[any]=None, error: Optional[Exception]=None, duration: float=0.0):
+    self.app_id = app_id
+    self.email = email
+    self.ordnance = ordnance
+    self.error = error
+    self.duration = duration
+
+  @property
+  def succeeded(self) -> bool:
+    return self.error is None
+
+class GooglePlayScheduler:
+  app_configs: List[Dict[str, any]]
+  max_browsers: int
+  browser_factory: Callable[[], any]
+  app_runner: Callable[[AccountSession, Dict[str, any]], any]
+  browser_closer: Optional[Callable[[any], None]]
+  pipeline: Optional[PostScrapePipeline]
+
+  def __init__(self, app_configs: List[Dict[str, any]], browser_factory: Callable[[], any], app_runner: Callable[[AccountSession, Dict[str, any]], any], max_browsers: int=2, browser_closer: Optional[Callable[[any], None]]=None, pipeline: Optional[PostScrapePipeline]=None):
+    self.app_configs = app_configs
+    self.browser_factory = browser_factory
+    self.app_runner = app_runner
+    self.max_browsers = max_browsers
+    self.browser_closer = browser_closer
+    self.pipeline = pipeline
+
+  @property
+  def account_configs(self) -> Dict[str, List[Dict[str, any]]]:
+    accounts = {}
+    for config in self.app_configs:
+      accounts.setdefault(config['email'], []).append(config)
+    return accounts
+
+  def run(self) -> List[AppRunResult]:
+    accounts = self.account_configs
+    with ThreadPoolExecutor(max_workers=max(min(self.max_browsers, len(accounts)), 1)) as executor:
+      account_results = list(executor.map(lambda a: self.run_account(*a), accounts.items()))
+    results = [r for results in account_results for r in results]
+
+    if self.pipeline:
+      failures = self.pipeline.drain()
+      for result in results:
+        if result.succeeded and failures.get(result.app_id):
+          result.error = failures[result.app_id]
+    return results
+
+  def run_account(self, email: str, configs: List[Dict[str, any]]) -> List[AppRunResult]:
+    try:
+      session = AccountSession(email=email, browser=self.browser_factory())
+    except Exception as e:
+      return [AppRunResult(app_id=c['app_id'], email=email, error=e) for c in configs]
+
+    results = []
+    try:
+      for config in configs:
+        start = time.monotonic()
+        try:
+          ordnance = self.app_runner(session, config)
+          results.append(AppRunResult(app_id=config['app_id'], email=email, ordnance=ordnance, duration=time.monotonic() - start))
+        except Exception as e:
+          results.append(AppRunResult(app_id=config['app_id'], email=email, error=e, duration=time.monotonic() - start))
+    finally:
+      if self.browser_closer:
+        self.browser_closer(session.browser)
+    return results
@@ -1,16 +1,78 @@
+import time
+
+# the bot is the first thing loaded from the package, so the timer covers raspador, selenium, pandas and lxml, which dominate startup
+package_import_started = time.perf_counter()
+
+import copy
 import os
+import json
 
 from pathlib import Path
-from raspador import Raspador, ReportRaspador, ScriptManeuver
-from typing import Dict
+from raspador import Raspador, ReportRaspador, ScriptManeuver, Maneuver
+from typing import Callable, Dict, List, Optional, Tuple
 from .google_play_pilot import GooglePlayPilot
+from .google_play_scheduler import AccountSession, AppRunResult, GooglePlayScheduler
+from .google_play_pipeline import PostScrapePipeline
+
+package_import_seconds = round(time.perf_counter() - package_import_started, 6)
+
+def load_google_play_maneuver(hot_reload: bool=False) -> Tuple[Maneuver, Dict[str, any]]:
+  start = time.perf_counter()
+  if hot_reload:
+    # dev only: the script is re-read and the parser reloaded on every run so edits apply without a restart
+    maneuver = ScriptManeuver(script_path=str(Path(__file__).parent / 'google_play_maneuver.py'))
+  else:
+    # a regular import is compiled once, cached in __pycache__ and shared by every later run in the process
+    from .google_play_maneuver import GooglePlayManeuver
+    maneuver = GooglePlayManeuver()
+  return maneuver, {
+    'mode': 'script' if hot_reload else 'import',
+    # paid once per process, before the first app; later apps in the same process report the same value
+    'package_import_seconds': package_import_seconds,
+    'maneuver_load_seconds': round(time.perf_counter() - start, 6),
+  }
 
 class GooglePlayBot(ReportRaspador):
   def scrape(self):
-    maneuver = ScriptManeuver(script_path=str(Path(__file__).parent / 'google_play_maneuver.py'))
+    maneuver, startup = load_google_play_maneuver(hot_reload=self.configuration.get('hot_reload_maneuvers', False))
     pilot = GooglePlayPilot(config=self.configuration, browser=self.browser, user=self.user)
+    self.report_startup(pilot, startup)
     
     self.fly(pilot=pilot, maneuver=maneuver)
     self.load(ordnance=pilot.deploy())
 
-    super().scrape()
\ No newline at end of file
+    super().scrape()
+
+  def scrape_app(self, session: AccountSession, config: Dict[str, any], pipeline: Optional[PostScrapePipeline]=None) -> any:
+    config = {**self.configuration, **config}
+    maneuver, startup = load_google_play_maneuver(hot_reload=config.get('hot_reload_maneuvers', False))
+    pilot = GooglePlayPilot(config=config, browser=session.browser, user=self.user, session=session, pipeline=pipeline)
+    self.report_startup(pilot, startup)
+
+    # raspador keeps flight state on the instance, so each app, and with it each scheduler thread, flies its own copy
+    flight = copy.copy(self)
+    flight.fly(pilot=pilot, maneuver=maneuver)
+    return pilot.deploy()
+
+  def report_startup(self, pilot: GooglePlayPilot, startup: Dict[str, any]):
+    (pilot.download_path / 'startup_report.json').write_text(json.dumps(startup, indent=2))
+
+  def scrape_apps(self, app_configs: List[Dict[str, any]], browser_factory: Callable[[], any], max_browsers: int=2, pipeline_workers: int=0) -> List[AppRunResult]:
+    pipeline = PostScrapePipeline(max_workers=pipeline_workers) if pipeline_workers else None
+    scheduler = GooglePlayScheduler(
+      app_configs=[{**self.configuration, **c} for c in app_configs],
+      browser_factory=browser_factory,
+      app_runner=lambda session, config: self.scrape_app(session=session, config=config, pipeline=pipeline),
+      max_browsers=max_browsers,
+      browser_closer=lambda b: b.driver.quit(),
+      pipeline=pipeline
+    )
+    try:
+      results = scheduler.run()
+    finally:
+      if pipeline:
+        pipeline.shutdown()
+    for result in results:
+      if result.succeeded:
+        self.load(ordnance=result.ordnance)
+    return results
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import time
+
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from .google_play_scheduler import AccountSession
+
+def cookie_matches_host(cookie: Dict[str, any], host: str) -> bool:
+  domain = cookie['domain'].lstrip('.')
+  return host == domain or host.endswith(f'.{domain}')
+
+class GooglePlaySessionStore:
+  store_path: Path
+  max_age: Optional[float]
+
+  def __init__(self, store_path: Path=Path('output/google_play/sessions'), max_age: Optional[float]=None):
+    self.store_path = store_path
+    self.max_age = max_age
+
+  def path_for(self, email: str) -> Path:
+    return self.store_path / f'{hashlib.sha256(email.lower().encode()).hexdigest()}.json'
+
+  def save(self, session: AccountSession, driver: any):
+    if not self.store_path.exists():
+      self.store_path.mkdir(parents=True)
+
+    current_url = urlparse(driver.current_url)
+    origin = f'{current_url.scheme}://{current_url.netloc}'
+    data = {
+      'email': session.email,
+      'saved_at': time.time(),
+      'cookies': driver.get_cookies(),
+      'local_storage': {origin: driver.execute_script('return Object.assign({}, window.localStorage);')},
+      'console_urls': session.console_urls,
+    }
+
+    # the session file holds live credentials, so it is never readable by others, not even briefly, and never left half written
+    path = self.path_for(session.email)
+    partial_path = path.with_name(f'{path.name}.part')
+    descriptor = os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, 'w') as f:
+      f.write(json.dumps(data))
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(partial_path, path)
+
+  def load(self, email: str) -> Optional[Dict[str, any]]:
+    path = self.path_for(email)
+    if not path.exists():
+      return None
+    data = json.loads(path.read_text())
+    if self.max_age is not None and time.time() - data['saved_at'] > self.max_age:
+      return None
+    return data
+
+  def restore(self, session: AccountSession, driver: any, console_url: str) -> bool:
+    data = self.load(session.email)
+    if data is None:
+      return False
+
+    # selenium only accepts cookies for the domain currently loaded, and only the console domain is needed to skip sign in
+    url = urlparse(console_url)
+    origin = f'{url.scheme}://{url.netloc}'
+    cookies = [c for c in data['cookies'] if cookie_matches_host(c, url.hostname)]
+    driver.get(origin)
+    for cookie in cookies:
+      if 'expiry' in cookie:
+        cookie['expiry'] = int(cookie['expiry'])
+      driver.add_cookie(cookie)
+
+    if origin in data['local_storage']:
+      driver.execute_script('for (const [k, v] of Object.entries(arguments[0])) { window.localStorage.setItem(k, v); }', data['local_storage'][origin])
+
+    session.console_urls.update(data['console_urls'])
+    return True
+
+  def clear(self, email: str):
+    path = self.path_for(email)
+    if path.exists():
+      path.unlink()
@@ -0,0 +1,293 @@
+import argparse
+import datetime
+import json
+import shutil
+import sqlite3
+import tempfile
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Optional
+from .google_play_ingestion import ExportKind, ExportSource, GooglePlayExportReader
+from .google_play_processor import GooglePlayProcessor, export_columns, country_sources, peak_rss_bytes, reconciliation_report
+from .google_play_writer import GooglePlayWriter
+
+default_sql_chunk_size = 100_000
+
+staging_columns = {
+  'country': ['date', 'app_name', 'country_code', 'total_impressions', 'total_downloads'],
+  'play_country': ['date', 'app_name', 'country_code', 'organic_impressions', 'organic_downloads'],
+  'channel': ['date', 'app_name', 'source', 'impressions', 'downloads'],
+  'scrape': ['date', 'app_name', 'source', 'impressions', 'downloads'],
+}
+
+def sql_literal(value: str) -> str:
+  return "'" + value.replace("'", "''") + "'"
+
+class SQLEngine:
+  def create_table(self, table: str, columns: List[str]):
+    dimensions = {'app_name', 'country_code', 'source'}
+    column_types = ', '.join(
+      f'{c} {"DATE" if c == "date" else "VARCHAR" if c in dimensions else "DOUBLE"}'
+      for c in columns
+    )
+    self.execute(f'CREATE TABLE {table} ({column_types})')
+
+  def execute(self, sql: str):
+    raise NotImplementedError()
+
+  def insert(self, table: str, df: pd.DataFrame):
+    raise NotImplementedError()
+
+  def query(self, sql: str) -> pd.DataFrame:
+    raise NotImplementedError()
+
+  def close(self):
+    pass
+
+class DuckDBEngine(SQLEngine):
+  def __init__(self, database_path: Optional[Path]=None, memory_limit: Optional[str]=None, threads: Optional[int]=None, temp_directory: Optional[Path]=None):
+    import duckdb
+    self.connection = duckdb.connect(str(database_path) if database_path else ':memory:')
+    # past memory_limit duckdb spills intermediate results to temp_directory instead of failing
+    if memory_limit:
+      self.connection.execute(f'SET memory_limit = {sql_literal(memory_limit)}')
+    if threads:
+      self.connection.execute(f'SET threads = {int(threads)}')
+    if temp_directory:
+      self.connection.execute(f'SET temp_directory = {sql_literal(str(temp_directory))}')
+
+  def execute(self, sql: str):
+    self.connection.execute(sql)
+
+  def insert(self, table: str, df: pd.DataFrame):
+    self.connection.register('staging_chunk', df)
+    try:
+      self.connection.execute(f'INSERT INTO {table} SELECT CAST(date AS DATE), {", ".join(df.columns[1:])} FROM staging_chunk')
+    finally:
+      self.connection.unregister('staging_chunk')
+
+  def query(self, sql: str) -> pd.DataFrame:
+    return self.connection.execute(sql).df()
+
+  def close(self):
+    self.connection.close()
+
+class SQLiteEngine(SQLEngine):
+  database_path: Path
+  _temporary_path: Optional[str]
+
+  def __init__(self, database_path: Optional[Path]=None):
+    # a file-backed database keeps the staged exports on disk rather than in memory
+    self._temporary_path = None if database_path else tempfile.mkdtemp(prefix='google-play-sql-')
+    self.database_path = database_path if database_path else Path(self._temporary_path) / 'processing.sqlite'
+    self.connection = sqlite3.connect(str(self.database_path))
+
+  def execute(self, sql: str):
+    self.connection.execute(sql)
+
+  def insert(self, table: str, df: pd.DataFrame):
+    df = df.assign(date=df['date'].dt.strftime('%Y-%m-%d'))
+    placeholders = ', '.join('?' for _ in df.columns)
+    self.connection.executemany(f'INSERT INTO {table} ({", ".join(df.columns)}) VALUES ({placeholders})', df.itertuples(index=False, name=None))
+
+  def query(self, sql: str) -> pd.DataFrame:
+    return pd.read_sql_query(sql, self.connection)
+
+  def close(self):
+    self.connection.close()
+    if self._temporary_path:
+      shutil.rmtree(self._temporary_path, ignore_errors=True)
+
+def sql_engine_for(engine: str, **options) -> SQLEngine:
+  if engine == 'duckdb':
+    return DuckDBEngine(**options)
+  if engine == 'sqlite':
+    # memory_limit, threads and temp_directory have no sqlite counterpart, and silently dropping them would hide a bad config
+    unsupported_options = sorted(k for k in options if k != 'database_path')
+    if unsupported_options:
+      raise ValueError('Unsupported sqlite engine options.', unsupported_options)
+    return SQLiteEngine(**options)
+  raise ValueError('Unsupported processing engine.', engine)
+
+class GooglePlaySQLProcessor(GooglePlayProcessor):
+  engine: str
+  engine_options: Dict[str, any]
+
+  def __init__(self, source_directory_path: Path, processed_data_path: Optional[Path]=None, engine: str='duckdb', engine_options: Optional[Dict[str, any]]=None, chunk_size: Optional[int]=None, writer: Optional[GooglePlayWriter]=None, compact: bool=False):
+    super().__init__(
+      source_directory_path=source_directory_path,
+      processed_data_path=processed_data_path,
+      chunk_size=chunk_size if chunk_size else default_sql_chunk_size,
+      writer=writer,
+      compact=compact
+    )
+    self.engine = engine
+    self.engine_options = engine_options if engine_options else {}
+
+  def process(self):
+    export_files = self.export_files()
+    reader = GooglePlayExportReader(chunk_size=self.chunk_size)
+    engine = sql_engine_for(self.engine, **self.engine_options)
+    try:
+      # exports are staged a chunk at a time, so only the reduced outputs are ever held in pandas
+      for kind in [ExportKind.country, ExportKind.play_country, ExportKind.channel]:
+        self._stage_exports(engine, reader, kind, export_files[kind])
+      engine.create_table('scrape', staging_columns['scrape'])
+      if export_files[ExportKind.scraper]:
+        engine.insert('scrape', self._read_scrapes(export_files[ExportKind.scraper])[staging_columns['scrape']])
+
+      engine.execute(self._country_master_sql())
+      self.country_impressions_df = self._output_frame(engine.query(self._country_output_sql('impressions')))
+      self.country_downloads_df = self._output_frame(engine.query(self._country_output_sql('downloads')))
+
+      df_ch = engine.query(self._channel_output_sql(reconcile=bool(export_files[ExportKind.scraper])))
+      self.channel_impressions_df = self._output_frame(df_ch[['date', 'impressions', 'platform_id', 'source', 'app_name']])
+      self.channel_downloads_df = self._output_frame(df_ch[['date', 'downloads', 'platform_id', 'source', 'app_name']])
+      self.reconciliation_report = self._reconciliation_report(engine) if export_files[ExportKind.scraper] else {'replaced_export_rows': 0, 'apps': {}}
+      self.process_peak_rss_bytes = peak_rss_bytes()
+    finally:
+      engine.close()
+
+  def _stage_exports(self, engine: SQLEngine, reader: GooglePlayExportReader, kind: ExportKind, sources: List[ExportSource]):
+    columns = staging_columns[kind.value]
+    engine.create_table(kind.value, columns)
+    if not sources:
+      return
+    for chunk in reader.iter_export_chunks(sources):
+      chunk = chunk.loc[:, 'Date':'Installers'].rename(columns=export_columns[kind])
+      engine.insert(kind.value, chunk[columns])
+
+  def _country_master_sql(self) -> str:
+    def grouped(table: str, prefix: str) -> str:
+      return f'''
+        SELECT date, app_name, CASE WHEN country_code = '' THEN 'XX' ELSE country_code END AS country_code,
+          SUM({prefix}_impressions) AS {prefix}_impressions, SUM({prefix}_downloads) AS {prefix}_downloads
+        FROM {table}
+        GROUP BY 1, 2, 3
+      '''
+    return f'''
+      CREATE TABLE country_master AS
+      WITH c AS ({grouped('country', 'total')}), pc AS ({grouped('play_country', 'organic')})
+      SELECT c.date, c.app_name, c.country_code, c.total_impressions, c.total_downloads,
+        COALESCE(pc.organic_impressions, 0) AS organic_impressions, COALESCE(pc.organic_downloads, 0) AS organic_downloads
+      FROM c LEFT JOIN pc ON c.date = pc.date AND c.app_name = pc.app_name AND c.country_code = pc.country_code
+    '''
+
+  def _country_output_sql(self, metric: str) -> str:
+    inorganic = f'total_{metric} - organic_{metric}'
+    return f'''
+      SELECT date, {metric}, 2 AS platform_id, source, app_name, country_code FROM (
+        SELECT date, app_name, country_code, organic_{metric} AS {metric}, {sql_literal(country_sources['organic'])} AS source, 0 AS part FROM country_master
+        UNION ALL
+        SELECT date, app_name, country_code, CASE WHEN {inorganic} < 0 THEN 0 ELSE {inorganic} END, {sql_literal(country_sources['inorganic'])}, 1 FROM country_master
+      ) AS melted
+      ORDER BY part, date, app_name, country_code
+    '''
+
+  def _channel_output_sql(self, reconcile: bool) -> str:
+    if not reconcile:
+      return 'SELECT date, app_name, source, impressions, downloads, 2 AS platform_id FROM channel'
+    return f'''
+      WITH overlap AS (
+        SELECT DISTINCT date, app_name FROM channel
+        INTERSECT
+        SELECT DISTINCT date, app_name FROM scrape
+      )
+      SELECT date, app_name, source, impressions, downloads, 2 AS platform_id FROM (
+        SELECT c.date, c.app_name, c.source, c.impressions, c.downloads, 0 AS part
+        FROM channel c JOIN overlap o ON c.date = o.date AND c.app_name = o.app_name
+        WHERE c.source <> {sql_literal(country_sources['organic'])}
+          AND NOT EXISTS (SELECT 1 FROM scrape s WHERE s.date = c.date AND s.app_name = c.app_name AND s.source = c.source)
+        UNION ALL
+        SELECT c.date, c.app_name, c.source, c.impressions, c.downloads, 0
+        FROM channel c
+        WHERE c.app_name NOT IN (SELECT DISTINCT app_name FROM scrape)
+        UNION ALL
+        SELECT s.date, s.app_name, s.source, s.impressions, s.downloads, 1
+        FROM scrape s JOIN overlap o ON s.date = o.date AND s.app_name = o.app_name
+      ) AS reconciled
+      ORDER BY part, date, app_name, source
+    '''
+
+  def _reconciliation_report(self, engine: SQLEngine) -> Dict[str, any]:
+    def days(sql: str) -> pd.MultiIndex:
+      df = engine.query(sql)
+      return pd.MultiIndex.from_arrays([pd.to_datetime(df['date']), df['app_name'].astype(str)], names=['date', 'app_name'])
+
+    replaced = engine.query(f'''
+      SELECT COUNT(*) AS replaced_rows FROM channel c
+      WHERE EXISTS (SELECT 1 FROM scrape s WHERE s.date = c.date AND s.app_name = c.app_name)
+        AND (c.source = {sql_literal(country_sources['organic'])}
+          OR EXISTS (SELECT 1 FROM scrape s WHERE s.date = c.date AND s.app_name = c.app_name AND s.source = c.source))
+    ''')
+    return reconciliation_report(
+      overlap=days('SELECT DISTINCT date, app_name FROM channel INTERSECT SELECT DISTINCT date, app_name FROM scrape ORDER BY 1, 2'),
+      export_only=days('SELECT DISTINCT date, app_name FROM channel WHERE app_name IN (SELECT DISTINCT app_name FROM scrape) EXCEPT SELECT DISTINCT date, app_name FROM scrape ORDER BY 1, 2'),
+      scrape_only=days('SELECT DISTINCT date, app_name FROM scrape EXCEPT SELECT DISTINCT date, app_name FROM channel ORDER BY 1, 2'),
+      replaced_rows=int(replaced['replaced_rows'][0])
+    )
+
+  def _output_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+    df = df.reset_index(drop=True)
+    df['date'] = pd.to_datetime(df['date'])
+    if self.compact:
+      df['platform_id'] = df['platform_id'].astype(np.int8)
+      return self._compact_frame(df)
+    return df.astype({'platform_id': 'int64'})
+
+def processed_frames(processor: GooglePlayProcessor) -> Dict[str, pd.DataFrame]:
+  return {
+    'country-impressions': processor.country_impressions_df,
+    'country-downloads': processor.country_downloads_df,
+    'channel-impressions': processor.channel_impressions_df,
+    'channel-downloads': processor.channel_downloads_df,
+  }
+
+def comparable_frame(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+  # row order differs between the engines, and categoricals sort by category order, so both are sorted on plain values
+  df = df[columns].astype({c: str for c in columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+  return df.sort_values(columns).reset_index(drop=True)
+
+def sql_parity(source_directory_path: Path, engine: str='duckdb', engine_options: Optional[Dict[str, any]]=None, compact: bool=False) -> Dict[str, Optional[str]]:
+  pandas_processor = GooglePlayProcessor(source_directory_path=source_directory_path, compact=compact)
+  pandas_processor.process()
+  sql_processor = GooglePlaySQLProcessor(source_directory_path=source_directory_path, engine=engine, engine_options=engine_options, compact=compact)
+  sql_processor.process()
+
+  mismatches = {}
+  sql_frames = processed_frames(sql_processor)
+  for name, expected in processed_frames(pandas_processor).items():
+    actual = sql_frames[name]
+    columns = list(actual.columns)
+    try:
+      pd.testing.assert_frame_equal(comparable_frame(actual, columns), comparable_frame(expected, columns), check_dtype=False)
+      mismatches[name] = None
+    except AssertionError as e:
+      mismatches[name] = str(e)
+  if pandas_processor.reconciliation_report != sql_processor.reconciliation_report:
+    mismatches['reconciliation-report'] = 'reconciliation reports differ'
+  return mismatches
+
+if __name__ == '__main__':
+  arg_parser = argparse.ArgumentParser(description='Check that the SQL processing engine matches the pandas processor.')
+  arg_parser.add_argument('path', type=Path, nargs='?', default=None, help='download directory to compare on; synthetic fixtures are generated when omitted')
+  arg_parser.add_argument('--engine', default='duckdb', help='duckdb or sqlite')
+  arg_parser.add_argument('--apps', type=int, default=2)
+  arg_parser.add_argument('--months', type=int, default=2)
+  args = arg_parser.parse_args()
+
+  if args.path:
+    results = sql_parity(args.path, engine=args.engine)
+  else:
+    from .google_play_benchmark import write_export_fixtures, write_scraper_fixture
+    with tempfile.TemporaryDirectory() as work_directory:
+      source_path = Path(work_directory) / 'exports'
+      write_export_fixtures(source_path, apps=args.apps, countries=10, months=args.months, end_month=datetime.date(2020, 10, 1))
+      write_scraper_fixture(source_path, app_id='com.example.app0', end_date=datetime.date(2020, 10, 31), days=30)
+      results = sql_parity(source_path, engine=args.engine)
+
+  print(json.dumps({name: 'ok' if mismatch is None else mismatch for name, mismatch in results.items()}, indent=2))
+  if any(mismatch is not None for mismatch in results.values()):
+    raise SystemExit(1)
@@ -0,0 +1,135 @@
+import datetime
+import json
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+retained_installers_prefix = 'acquisition/retained_installers'
+
+class StorageObject:
+  name: str
+  generation: str
+  size: int
+
+  def __init__(self, name: str, generation: str, size: int):
+    self.name = name
+    self.generation = generation
+    self.size = size
+
+class ReportStorageClient:
+  def list_objects(self, prefix: str) -> List[StorageObject]:
+    raise NotImplementedError()
+
+  def download(self, storage_object: StorageObject, path: Path):
+    raise NotImplementedError()
+
+class GCSReportStorageClient(ReportStorageClient):
+  bucket_name: str
+
+  def __init__(self, bucket_name: str, credentials_path: Optional[str]=None):
+    from google.cloud import storage
+    client = storage.Client.from_service_account_json(credentials_path) if credentials_path else storage.Client()
+    self.bucket_name = bucket_name
+    self.bucket = client.bucket(bucket_name)
+
+  def list_objects(self, prefix: str) -> List[StorageObject]:
+    return [
+      StorageObject(name=b.name, generation=str(b.generation), size=b.size)
+      for b in self.bucket.list_blobs(prefix=prefix)
+    ]
+
+  def download(self, storage_object: StorageObject, path: Path):
+    blob = self.bucket.blob(storage_object.name, generation=int(storage_object.generation))
+    blob.download_to_filename(str(path))
+
+class LocalReportStorageClient(ReportStorageClient):
+  root_path: Path
+
+  def __init__(self, root_path: Path):
+    self.root_path = root_path
+
+  def list_objects(self, prefix: str) -> List[StorageObject]:
+    directory, _, name_prefix = prefix.rpartition('/')
+    directory_path = self.root_path / directory
+    if not directory_path.exists():
+      return []
+    objects = []
+    for path in sorted(directory_path.glob(f'{name_prefix}*')):
+      stat = path.stat()
+      objects.append(StorageObject(name=str(path.relative_to(self.root_path)), generation=f'{stat.st_mtime_ns}-{stat.st_size}', size=stat.st_size))
+    return objects
+
+  def download(self, storage_object: StorageObject, path: Path):
+    shutil.copyfile(self.root_path / storage_object.name, path)
+
+def missing_months(months: List[datetime.date], fetched: Dict[datetime.date, List[Path]]) -> List[datetime.date]:
+  return sorted({datetime.date(m.year, m.month, 1) for m in months} - set(fetched))
+
+class BucketExportFetcher:
+  client: ReportStorageClient
+  app_id: str
+  mirror_path: Path
+  max_workers: int
+  generations: Dict[str, str]
+
+  def __init__(self, client: ReportStorageClient, app_id: str, mirror_path: Path, max_workers: int=4):
+    self.client = client
+    self.app_id = app_id
+    self.mirror_path = mirror_path
+    self.max_workers = max_workers
+    self.generations = json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+
+  @property
+  def state_path(self) -> Path:
+    return self.mirror_path / 'generations.json'
+
+  def month_prefix(self, month: datetime.date) -> str:
+    return f'{retained_installers_prefix}/retained_installers_{self.app_id}_{month.strftime("%Y%m")}'
+
+  def mirrored_path(self, storage_object: StorageObject) -> Path:
+    return self.mirror_path / Path(storage_object.name).name
+
+  def is_current(self, storage_object: StorageObject) -> bool:
+    return self.generations.get(storage_object.name) == storage_object.generation and self.mirrored_path(storage_object).exists()
+
+  def fetch_object(self, storage_object: StorageObject) -> Path:
+    path = self.mirrored_path(storage_object)
+    if not self.is_current(storage_object):
+      partial_path = path.with_name(f'{path.name}.part')
+      self.client.download(storage_object, partial_path)
+      partial_path.rename(path)
+    return path
+
+  def fetch(self, months: List[datetime.date], directory_path: Path) -> Dict[datetime.date, List[Path]]:
+    # only months with objects in the bucket are returned; whether a missing month is an error is up to the caller
+    self.mirror_path.mkdir(parents=True, exist_ok=True)
+    month_objects = {
+      datetime.date(m.year, m.month, 1): self.client.list_objects(self.month_prefix(m))
+      for m in months
+    }
+    storage_objects = [o for objects in month_objects.values() for o in objects]
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      mirrored_paths = dict(zip([o.name for o in storage_objects], executor.map(self.fetch_object, storage_objects)))
+
+    for storage_object in storage_objects:
+      self.generations[storage_object.name] = storage_object.generation
+    self.state_path.write_text(json.dumps(self.generations, indent=2, sort_keys=True))
+
+    fetched = {}
+    for month, objects in month_objects.items():
+      paths = []
+      for storage_object in objects:
+        path = directory_path / Path(storage_object.name).name
+        if path.exists():
+          path.unlink()
+        try:
+          os.link(mirrored_paths[storage_object.name], path)
+        except OSError:
+          shutil.copyfile(mirrored_paths[storage_object.name], path)
+        paths.append(path)
+      if paths:
+        fetched[month] = paths
+    return fetched
@@ -0,0 +1,160 @@
+import argparse
+import functools
+import inspect
+import json
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Generator, Iterable, List, Optional
+
+class Span:
+  span_id: str
+  parent_id: Optional[str]
+  name: str
+  started_at: float
+  attributes: Dict[str, any]
+  _start: float
+
+  def __init__(self, name: str, parent_id: Optional[str]):
+    self.span_id = uuid.uuid4().hex[:16]
+    self.parent_id = parent_id
+    self.name = name
+    self.started_at = time.time()
+    self.attributes = {}
+    self._start = time.perf_counter()
+
+  @property
+  def elapsed(self) -> float:
+    return time.perf_counter() - self._start
+
+class GooglePlayTracer:
+  run_id: str
+  app_id: str
+  path_factory: Callable[[], Path]
+  _local: threading.local
+  _lock: threading.Lock
+
+  def __init__(self, app_id: str, path_factory: Callable[[], Path]):
+    self.run_id = uuid.uuid4().hex
+    self.app_id = app_id
+    self.path_factory = path_factory
+    self._local = threading.local()
+    self._lock = threading.Lock()
+
+  @property
+  def stack(self) -> List[Span]:
+    # spans nest per thread so that pipeline stages running off the browser thread get their own tree
+    if not hasattr(self._local, 'stack'):
+      self._local.stack = []
+    return self._local.stack
+
+  def start(self, name: str, **attributes) -> Span:
+    span = Span(name=name, parent_id=self.stack[-1].span_id if self.stack else None)
+    span.attributes.update(attributes)
+    self.stack.append(span)
+    return span
+
+  def annotate(self, **attributes):
+    if self.stack:
+      self.stack[-1].attributes.update(attributes)
+
+  def finish(self, span: Span, status: str='ok'):
+    if span in self.stack:
+      self.stack.remove(span)
+    event = {
+      'run_id': self.run_id,
+      'app_id': self.app_id,
+      'span_id': span.span_id,
+      'parent_id': span.parent_id,
+      'name': span.name,
+      'started_at': span.started_at,
+      'wall_seconds': round(span.elapsed, 6),
+      'status': status,
+      'attributes': span.attributes,
+    }
+    with self._lock, open(self.path_factory(), 'a') as f:
+      f.write(json.dumps(event, default=str) + '\n')
+
+  @contextmanager
+  def span(self, name: str, **attributes) -> Generator[Span, None, None]:
+    span = self.start(name, **attributes)
+    status = 'ok'
+    try:
+      yield span
+    except BaseException as e:
+      status = 'error'
+      span.attributes['error'] = f'{type(e).__name__}: {e}'
+      raise
+    finally:
+      self.finish(span, status=status)
+
+def traced(attempt: Callable) -> Callable:
+  @functools.wraps(attempt)
+  def wrapper(self, pilot):
+    self._trace_attempts = getattr(self, '_trace_attempts', 0) + 1
+    span = pilot.tracer.start(type(self).__name__, attempt=self._trace_attempts, retries=self._trace_attempts - 1)
+    status = 'ok'
+    try:
+      result = attempt(self, pilot)
+      if inspect.isgenerator(result):
+        yield from result
+      ordnance = getattr(self, 'ordnance', None)
+      if hasattr(ordnance, 'shape'):
+        span.attributes['rows'] = ordnance.shape[0]
+    except GeneratorExit:
+      status = 'abandoned'
+      raise
+    except BaseException as e:
+      status = 'error'
+      span.attributes['error'] = f'{type(e).__name__}: {e}'
+      raise
+    finally:
+      pilot.tracer.finish(span, status=status)
+  return wrapper
+
+def read_events(paths: Iterable[Path]) -> List[Dict[str, any]]:
+  events = []
+  for path in paths:
+    with open(path) as f:
+      events.extend(json.loads(line) for line in f if line.strip())
+  return events
+
+def summarize(events: List[Dict[str, any]]) -> Dict[str, List[Dict[str, any]]]:
+  summary = {}
+  for event in events:
+    steps = summary.setdefault(event['app_id'], {})
+    step = steps.setdefault(event['name'], {'name': event['name'], 'count': 0, 'errors': 0, 'retries': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'runs': set()})
+    step['count'] += 1
+    step['errors'] += event['status'] == 'error'
+    step['retries'] += event['attributes'].get('attempt', 1) > 1
+    step['total_seconds'] += event['wall_seconds']
+    step['max_seconds'] = max(step['max_seconds'], event['wall_seconds'])
+    step['runs'].add(event['run_id'])
+
+  report = {}
+  for app_id, steps in summary.items():
+    rows = []
+    for step in steps.values():
+      runs = len(step.pop('runs'))
+      step['runs'] = runs
+      step['seconds_per_run'] = round(step['total_seconds'] / runs, 3)
+      step['total_seconds'] = round(step['total_seconds'], 3)
+      step['max_seconds'] = round(step['max_seconds'], 3)
+      rows.append(step)
+    report[app_id] = sorted(rows, key=lambda r: -r['seconds_per_run'])
+  return report
+
+if __name__ == '__main__':
+  arg_parser = argparse.ArgumentParser(description='Summarize Google Play maneuver traces across runs.')
+  arg_parser.add_argument('paths', type=Path, nargs='+', help='trace.jsonl files or directories to search for them')
+  arg_parser.add_argument('--top', type=int, default=10, help='number of slowest steps to show per app')
+  args = arg_parser.parse_args()
+
+  trace_paths = [p for path in args.paths for p in ([path] if path.is_file() else path.rglob('trace.jsonl'))]
+  for app_id, steps in summarize(read_events(trace_paths)).items():
+    print(app_id)
+    for step in steps[:args.top]:
+      print(f"  {step['name']:<40} {step['seconds_per_run']:>10.3f}s/run  max {step['max_seconds']:.3f}s  x{step['count']}  retries {step['retries']}  errors {step['errors']}")
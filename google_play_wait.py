@@ -0,0 +1,67 @@
+import time
+
+from typing import Callable, Dict, List, Optional
+
+default_wait_timeout = 15.0
+default_wait_timeouts = {
+  'download_finished': 120.0,
+}
+partial_download_patterns = ['*.crdownload', '*.part', '*.download']
+
+class WaitBudget:
+  timeouts: Dict[str, float]
+  poll_interval: float
+  timings: Dict[str, List[float]]
+  timeout_counts: Dict[str, int]
+
+  def __init__(self, timeouts: Optional[Dict[str, float]]=None, poll_interval: float=0.25):
+    self.timeouts = {**default_wait_timeouts, **(timeouts if timeouts else {})}
+    self.poll_interval = poll_interval
+    self.timings = {}
+    self.timeout_counts = {}
+
+  def timeout_for(self, name: str) -> float:
+    return self.timeouts.get(name, default_wait_timeout)
+
+  def wait_for(self, name: str, condition: Callable[[], bool], timeout: Optional[float]=None, required: bool=False) -> bool:
+    timeout = timeout if timeout is not None else self.timeout_for(name)
+    start = time.monotonic()
+    satisfied = False
+    while True:
+      try:
+        satisfied = bool(condition())
+      except Exception:
+        # the DOM may be mid-render (stale or detached elements); treat as not yet satisfied
+        satisfied = False
+      if satisfied or time.monotonic() - start >= timeout:
+        break
+      time.sleep(self.poll_interval)
+
+    self.timings.setdefault(name, []).append(time.monotonic() - start)
+    if not satisfied:
+      self.timeout_counts[name] = self.timeout_counts.get(name, 0) + 1
+      # a required wait guards what is read next; carrying on would read the page as it was before, under the wrong date
+      if required:
+        raise TimeoutError(f'Timed out waiting for {name} after {timeout}s.')
+    return satisfied
+
+  def report(self) -> Dict[str, Dict[str, float]]:
+    return {
+      name: {
+        'count': len(timings),
+        'total_seconds': round(sum(timings), 3),
+        'max_seconds': round(max(timings), 3),
+        'timeouts': self.timeout_counts.get(name, 0),
+        'timeout_seconds': self.timeout_for(name),
+      }
+      for name, timings in sorted(self.timings.items(), key=lambda i: -sum(i[1]))
+    }
+
+def xpath_displayed(browser: any, xpath: str) -> Callable[[], bool]:
+  return lambda: any(e.is_displayed() for e in browser.driver.find_elements('xpath', xpath))
+
+def xpath_hidden(browser: any, xpath: str) -> Callable[[], bool]:
+  return lambda: not any(e.is_displayed() for e in browser.driver.find_elements('xpath', xpath))
+
+def window_count(browser: any, count: int) -> Callable[[], bool]:
+  return lambda: len(browser.driver.window_handles) >= count
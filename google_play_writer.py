@@ -0,0 +1,74 @@
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Type
+
+compact_categories = ['app_name', 'country_code', 'source']
+compact_counts = ['impressions', 'downloads']
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+  dtypes = {c: 'category' for c in compact_categories if c in df.columns}
+  dtypes.update({c: 'int32' for c in compact_counts if c in df.columns})
+  if 'platform_id' in df.columns:
+    dtypes['platform_id'] = 'int8'
+  return df.astype(dtypes)
+
+class GooglePlayWriter:
+  extension: str
+  partition: bool
+  compact: bool
+
+  def __init__(self, partition: bool=False, compact: bool=False):
+    self.partition = partition
+    self.compact = compact
+
+  def write(self, df: pd.DataFrame, directory_path: Path, name: str) -> List[Path]:
+    if self.compact:
+      df = compact_frame(df)
+
+    if not self.partition:
+      path = directory_path / f'{name}.{self.extension}'
+      self.write_file(df, path)
+      return [path]
+
+    paths = []
+    months = df.date.dt.strftime('%Y-%m')
+    for (app_name, month), partition_df in df.groupby([df.app_name, months], sort=True, observed=True):
+      partition_path = directory_path / name / str(app_name)
+      partition_path.mkdir(parents=True, exist_ok=True)
+      path = partition_path / f'{month}.{self.extension}'
+      self.write_file(partition_df, path)
+      paths.append(path)
+    return paths
+
+  def write_file(self, df: pd.DataFrame, path: Path):
+    raise NotImplementedError()
+
+class CSVWriter(GooglePlayWriter):
+  extension = 'csv'
+
+  def write_file(self, df: pd.DataFrame, path: Path):
+    df.to_csv(f'{path.absolute()}', index=None)
+
+class ParquetWriter(GooglePlayWriter):
+  extension = 'parquet'
+
+  def write_file(self, df: pd.DataFrame, path: Path):
+    df.to_parquet(path, index=False)
+
+class FeatherWriter(GooglePlayWriter):
+  extension = 'feather'
+
+  def write_file(self, df: pd.DataFrame, path: Path):
+    df.reset_index(drop=True).to_feather(path)
+
+writer_types: Dict[str, Type[GooglePlayWriter]] = {
+  'csv': CSVWriter,
+  'parquet': ParquetWriter,
+  'feather': FeatherWriter,
+}
+
+def writer_for_format(output_format: str, partition: bool=False, compact: bool=False) -> GooglePlayWriter:
+  if output_format not in writer_types:
+    raise ValueError('Unsupported output format.', output_format)
+  return writer_types[output_format](partition=partition, compact=compact)
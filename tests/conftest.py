@@ -0,0 +1,14 @@
+import sys
+import types
+
+from pathlib import Path
+
+# the repository root is the google_play package itself (it is checked out as a submodule named google_play in the bots
+# that use it), so the tests map that name onto the checkout. the package __init__ is not run, since it imports the
+# raspador bot framework; tests of modules that need raspador skip themselves when it is not installed
+#
+#   python -m pytest tests
+if 'google_play' not in sys.modules:
+  package = types.ModuleType('google_play')
+  package.__path__ = [str(Path(__file__).parent.parent)]
+  sys.modules['google_play'] = package
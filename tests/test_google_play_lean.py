@@ -0,0 +1,44 @@
+import unittest
+
+from google_play.google_play_lean import LeanBrowsingProfile
+
+class FakeDriver:
+  entries: list
+  blocked_urls: list
+
+  def __init__(self):
+    self.entries = [['https://play.google.com/console/app.js', 100], ['https://play.google.com/logo.png', 50]]
+    self.blocked_urls = []
+
+  def execute_script(self, script):
+    return self.entries
+
+  def execute_cdp_cmd(self, command, parameters):
+    if command == 'Network.setBlockedURLs':
+      self.blocked_urls = parameters['urls']
+
+class TestLeanBrowsingProfile(unittest.TestCase):
+  def test_unblocked_patterns_remove_blocked_entries(self):
+    profile = LeanBrowsingProfile(blocked_patterns=['*.png*', '*.woff*'], unblocked_patterns=['*.png*'])
+    self.assertEqual(profile.blocked_patterns, ['*.woff*'])
+
+  def test_rejects_unblocked_patterns_matching_no_blocked_entry(self):
+    with self.assertRaises(ValueError):
+      LeanBrowsingProfile(blocked_patterns=['*.png*'], unblocked_patterns=['*logo.png*'])
+
+  def test_report_counts_only_pages_since_the_pilot_started(self):
+    driver = FakeDriver()
+    profile = LeanBrowsingProfile(blocked_patterns=['*.png*'])
+    profile.sample(driver)
+    profile.sample(driver)
+    self.assertEqual(driver.blocked_urls, ['*.png*'])
+
+    since = len(profile.pages)
+    profile.sample(driver)
+    report = profile.report(since=since)
+    self.assertEqual(report['baseline_pages'], 1)
+    self.assertEqual(report['lean_pages'], 1)
+    self.assertEqual(report['estimated_bytes_saved'], 50)
+
+if __name__ == '__main__':
+  unittest.main()
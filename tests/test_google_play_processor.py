@@ -0,0 +1,39 @@
+import datetime
+import tempfile
+import unittest
+
+from pathlib import Path
+from google_play.google_play_benchmark import country_codes, write_export_fixtures, write_scraper_fixture
+from google_play.google_play_processor import GooglePlayProcessor
+from google_play.google_play_sql import processed_frames
+
+class TestCompactProcessing(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.source_path = Path(self.directory.name)
+    # the fixture countries end with a blank code, which exports use for unknown countries
+    write_export_fixtures(self.source_path, apps=2, countries=len(country_codes), months=2, end_month=datetime.date(2020, 10, 1))
+    write_scraper_fixture(self.source_path, app_id='com.example.app0', end_date=datetime.date(2020, 10, 31), days=10)
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def processed(self, compact: bool) -> GooglePlayProcessor:
+    processor = GooglePlayProcessor(source_directory_path=self.source_path, compact=compact)
+    processor.process()
+    return processor
+
+  def test_compact_matches_default_with_blank_countries(self):
+    expected = processed_frames(self.processed(compact=False))
+    actual = processed_frames(self.processed(compact=True))
+
+    for name, expected_df in expected.items():
+      actual_df = actual[name]
+      self.assertEqual(len(actual_df), len(expected_df), name)
+      metric = expected_df.columns[1]
+      self.assertAlmostEqual(float(actual_df[metric].sum()), float(expected_df[metric].sum()), places=3, msg=name)
+    self.assertIn('XX', set(actual['country-impressions'].country_code.astype(str)))
+    self.assertNotIn('', set(actual['country-impressions'].country_code.astype(str)))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,134 @@
+import http.cookiejar
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+from google_play.google_play_scheduler import AccountSession, GooglePlayScheduler
+
+class StubConsoleHandler(BaseHTTPRequestHandler):
+  sign_ins: Dict[str, int]
+  lock: threading.Lock
+
+  def do_GET(self):
+    url = urlparse(self.path)
+    if url.path == '/signin':
+      email = parse_qs(url.query)['email'][0]
+      with self.lock:
+        self.sign_ins[email] = self.sign_ins.get(email, 0) + 1
+      self.respond(200, '<html><body>signed in</body></html>', headers={'Set-Cookie': f'sid={email}; Path=/'})
+      return
+
+    if not self.headers.get('Cookie', '').startswith('sid='):
+      self.respond(302, '', headers={'Location': '/signin'})
+      return
+    company = url.path.rsplit('/', 1)[-1]
+    if company == 'broken':
+      self.respond(500, '<html><body>error</body></html>')
+      return
+    self.respond(200, f'<html><body><div class="business-name">{company}</div></body></html>')
+
+  def respond(self, status: int, body: str, headers: Dict[str, str]={}):
+    self.send_response(status)
+    for name, value in headers.items():
+      self.send_header(name, value)
+    self.send_header('Content-Type', 'text/html')
+    self.end_headers()
+    self.wfile.write(body.encode())
+
+  def log_message(self, format, *args):
+    pass
+
+class StubBrowser:
+  opener: urllib.request.OpenerDirector
+  closed: bool
+
+  def __init__(self):
+    self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    self.closed = False
+
+class TestGooglePlayScheduler(unittest.TestCase):
+  def setUp(self):
+    handler = type('Handler', (StubConsoleHandler,), {'sign_ins': {}, 'lock': threading.Lock()})
+    self.handler = handler
+    self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    self.browsers: List[StubBrowser] = []
+    self.open_browsers = 0
+    self.max_open_browsers = 0
+    self.lock = threading.Lock()
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+
+  def browser_factory(self) -> StubBrowser:
+    with self.lock:
+      self.open_browsers += 1
+      self.max_open_browsers = max(self.max_open_browsers, self.open_browsers)
+      browser = StubBrowser()
+      self.browsers.append(browser)
+    return browser
+
+  def browser_closer(self, browser: StubBrowser):
+    with self.lock:
+      self.open_browsers -= 1
+    browser.closed = True
+
+  def app_runner(self, session: AccountSession, config: Dict[str, any]) -> str:
+    if not session.signed_in:
+      session.browser.opener.open(f'{self.base_url}/signin?email={session.email}').read()
+      session.signed_in = True
+    url = session.console_urls.get(config['company_name'], f'{self.base_url}/console/{config["company_name"]}')
+    with session.browser.opener.open(url) as response:
+      session.console_urls[config['company_name']] = response.geturl()
+      return response.read().decode()
+
+  def scheduler(self, app_configs: List[Dict[str, any]], max_browsers: int=2) -> GooglePlayScheduler:
+    return GooglePlayScheduler(
+      app_configs=app_configs,
+      browser_factory=self.browser_factory,
+      app_runner=self.app_runner,
+      max_browsers=max_browsers,
+      browser_closer=self.browser_closer
+    )
+
+  def test_signs_in_once_per_account_across_companies(self):
+    results = self.scheduler([
+      {'email': 'a@example.com', 'app_id': 'com.example.a1', 'company_name': 'alpha'},
+      {'email': 'a@example.com', 'app_id': 'com.example.a2', 'company_name': 'beta'},
+      {'email': 'b@example.com', 'app_id': 'com.example.b1', 'company_name': 'gamma'},
+    ]).run()
+
+    self.assertTrue(all(r.succeeded for r in results))
+    self.assertEqual(self.handler.sign_ins, {'a@example.com': 1, 'b@example.com': 1})
+    self.assertIn('>beta<', next(r.ordnance for r in results if r.app_id == 'com.example.a2'))
+
+  def test_bounds_concurrent_browsers(self):
+    results = self.scheduler([
+      {'email': f'{n}@example.com', 'app_id': f'com.example.{n}', 'company_name': 'alpha'}
+      for n in range(4)
+    ], max_browsers=2).run()
+
+    self.assertEqual(len(results), 4)
+    self.assertLessEqual(self.max_open_browsers, 2)
+    self.assertEqual(len(self.browsers), 4)
+    self.assertTrue(all(b.closed for b in self.browsers))
+
+  def test_failed_app_does_not_stop_its_account(self):
+    results = self.scheduler([
+      {'email': 'a@example.com', 'app_id': 'com.example.broken', 'company_name': 'broken'},
+      {'email': 'a@example.com', 'app_id': 'com.example.a1', 'company_name': 'alpha'},
+    ]).run()
+
+    results = {r.app_id: r for r in results}
+    self.assertIsInstance(results['com.example.broken'].error, urllib.error.HTTPError)
+    self.assertTrue(results['com.example.a1'].succeeded)
+    self.assertEqual(self.handler.sign_ins, {'a@example.com': 1})
+
+if __name__ == '__main__':
+  unittest.main()
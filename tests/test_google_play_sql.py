@@ -0,0 +1,31 @@
+import datetime
+import tempfile
+import unittest
+
+from pathlib import Path
+from google_play.google_play_benchmark import country_codes, write_export_fixtures, write_scraper_fixture
+from google_play.google_play_sql import sql_parity
+
+class TestSQLParity(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.source_path = Path(self.directory.name)
+    # the fixture countries end with a blank code, and only the first of the two apps has a scrape
+    write_export_fixtures(self.source_path, apps=2, countries=len(country_codes), months=2, end_month=datetime.date(2020, 10, 1))
+    write_scraper_fixture(self.source_path, app_id='com.example.app0', end_date=datetime.date(2020, 10, 31), days=30)
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def assertParity(self, mismatches):
+    self.assertEqual(sorted(mismatches), ['channel-downloads', 'channel-impressions', 'country-downloads', 'country-impressions'])
+    self.assertEqual({name: m for name, m in mismatches.items() if m is not None}, {})
+
+  def test_sqlite_matches_pandas(self):
+    self.assertParity(sql_parity(self.source_path, engine='sqlite'))
+
+  def test_sqlite_matches_pandas_compact(self):
+    self.assertParity(sql_parity(self.source_path, engine='sqlite', compact=True))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,87 @@
+import datetime
+import importlib.util
+import tempfile
+import unittest
+
+from pathlib import Path
+from types import SimpleNamespace
+from google_play.google_play_storage import BucketExportFetcher, LocalReportStorageClient, missing_months, retained_installers_prefix
+
+class TestBucketExportFetcher(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.root_path = Path(self.directory.name)
+    self.bucket_path = self.root_path / 'bucket'
+    self.mirror_path = self.root_path / 'mirror'
+    self.download_path = self.root_path / 'download'
+    self.download_path.mkdir()
+    (self.bucket_path / retained_installers_prefix).mkdir(parents=True)
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def add_export(self, name: str, content: bytes) -> Path:
+    path = self.bucket_path / retained_installers_prefix / name
+    path.write_bytes(content)
+    return path
+
+  def fetcher(self) -> BucketExportFetcher:
+    return BucketExportFetcher(
+      client=LocalReportStorageClient(root_path=self.bucket_path),
+      app_id='com.example.app',
+      mirror_path=self.mirror_path
+    )
+
+  def test_fetches_requested_months_for_the_app(self):
+    self.add_export('retained_installers_com.example.app_202001_overview.zip', b'january')
+    self.add_export('retained_installers_com.example.app_202002_overview.zip', b'february')
+    self.add_export('retained_installers_com.example.app_202003_overview.zip', b'march')
+    self.add_export('retained_installers_com.example.other_202001_overview.zip', b'other')
+
+    fetched = self.fetcher().fetch(months=[datetime.date(2020, 1, 15), datetime.date(2020, 2, 1)], directory_path=self.download_path)
+
+    self.assertEqual(sorted(fetched), [datetime.date(2020, 1, 1), datetime.date(2020, 2, 1)])
+    self.assertEqual([p.read_bytes() for p in fetched[datetime.date(2020, 1, 1)]], [b'january'])
+    self.assertEqual(sorted(p.name for p in self.download_path.iterdir()), [
+      'retained_installers_com.example.app_202001_overview.zip',
+      'retained_installers_com.example.app_202002_overview.zip',
+    ])
+
+  def test_reports_missing_months(self):
+    # the fetcher returns what the bucket has; FetchBucketExportManeuver raises for the missing months
+    self.add_export('retained_installers_com.example.app_202002_overview.zip', b'february')
+    months = [datetime.datetime(2020, 1, 31), datetime.datetime(2020, 2, 29)]
+    fetched = self.fetcher().fetch(months=months, directory_path=self.download_path)
+
+    self.assertEqual(sorted(fetched), [datetime.date(2020, 2, 1)])
+    self.assertEqual(missing_months(months, fetched), [datetime.date(2020, 1, 1)])
+
+  def test_downloads_only_changed_objects(self):
+    path = self.add_export('retained_installers_com.example.app_202001_overview.zip', b'january')
+    months = [datetime.date(2020, 1, 1)]
+    self.fetcher().fetch(months=months, directory_path=self.download_path)
+    mirrored_path = self.mirror_path / path.name
+    mirrored_mtime = mirrored_path.stat().st_mtime_ns
+
+    self.fetcher().fetch(months=months, directory_path=self.download_path)
+    self.assertEqual(mirrored_path.stat().st_mtime_ns, mirrored_mtime)
+
+    path.write_bytes(b'january restated')
+    fetched = self.fetcher().fetch(months=months, directory_path=self.download_path)
+    self.assertEqual(fetched[months[0]][0].read_bytes(), b'january restated')
+
+@unittest.skipUnless(importlib.util.find_spec('raspador'), 'the pilot needs raspador')
+class TestExportSource(unittest.TestCase):
+  def export_source(self, config):
+    from google_play.google_play_pilot import GooglePlayPilot
+    return GooglePlayPilot.export_source.fget(SimpleNamespace(config=config))
+
+  def test_defaults_to_console(self):
+    self.assertEqual(self.export_source({}), 'console')
+
+  def test_rejects_unknown_source(self):
+    with self.assertRaises(ValueError):
+      self.export_source({'export_source': 'gsc'})
+
+if __name__ == '__main__':
+  unittest.main()